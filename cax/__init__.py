@@ -1,5 +1,7 @@
 """Cactus-RaMAx toolkit package."""
-from . import config, parser, planner, ui
+from importlib import import_module
+
+from . import config, parser, planner
 from .models import Plan, PrepareHeader, Round, Step
 from .runner import PlanRunner
 
@@ -14,3 +16,10 @@ __all__ = [
     "Step",
     "PlanRunner",
 ]
+
+
+def __getattr__(name: str):
+    # The Textual UI is heavy to import; load it only when ``cax.ui`` is first accessed.
+    if name == "ui":
+        return import_module(".ui", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -10,7 +10,7 @@ import typer
 from rich import print
 import shutil
 
-from . import command_prompt, history, parser, ui as ui_module
+from . import history, parser
 from .models import Plan, RunSettings
 from .runner import PlanRunner
 
@@ -58,6 +58,9 @@ def ui(
 ) -> None:
     """Launch the interactive Textual UI for plan editing."""
 
+    # Textual is only needed here; keep it out of the import path for --help and other commands.
+    from . import command_prompt, ui as ui_module
+
     executable = "cactus-prepare"
     if prepare_args is None and from_file is None:
         prompt_result = command_prompt.prompt_prepare_command()
@@ -1,6 +1,7 @@
 """Core data models for the Cactus-RaMAx workflow."""
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Literal, Optional
@@ -48,6 +49,13 @@ class Step(BaseModel):
     def _ensure_raw(cls, value: str) -> str:
         return value.strip()
 
+    @field_validator("kind", "root")
+    @classmethod
+    def _intern_names(cls, value: Optional[str]) -> Optional[str]:
+        # Roots and kinds repeat across steps, rounds and planner indexes; interned keys
+        # let dict/set lookups succeed on identity.
+        return sys.intern(value) if value else value
+
     def short_label(self) -> str:
         """Return a concise label suitable for log names or UI display."""
 
@@ -72,6 +80,11 @@ class Round(BaseModel):
     ramax_opts: list[str] = Field(default_factory=list)
     manual_ramax_command: Optional[str] = None
 
+    @field_validator("name", "root")
+    @classmethod
+    def _intern_names(cls, value: str) -> str:
+        return sys.intern(value) if value else value
+
     @model_validator(mode="after")
     def _validate_round(self) -> "Round":
         if not self.target_hal:
@@ -100,7 +113,7 @@ class Plan(BaseModel):
         return value
 
 
-@dataclass
+@dataclass(slots=True)
 class RunSettings:
     """Runtime-only options applied immediately before executing a plan."""
 
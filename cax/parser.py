@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from datetime import datetime
+from functools import lru_cache
 import re
 import shlex
 from typing import Iterable, List, Optional
@@ -30,8 +31,17 @@ class ParseError(RuntimeError):
 
 
 def parse_prepare_script(text: str) -> Plan:
-    """Parse *text* generated by ``cactus-prepare`` into a :class:`Plan`."""
+    """Parse *text* generated by ``cactus-prepare`` into a :class:`Plan`.
 
+    Parsing the same text again reuses the previous result; callers mutate plans
+    (RaMAx toggles, options), so each call gets its own deep copy.
+    """
+
+    return _parse_prepare_script_cached(text).model_copy(deep=True)
+
+
+@lru_cache(maxsize=8)
+def _parse_prepare_script_cached(text: str) -> Plan:
     lines = [_strip_ansi(line) for line in text.splitlines()]
     header = _parse_header(lines)
     preprocess_lines, alignment_lines, halmerge_lines = _split_sections(lines)
@@ -227,26 +237,42 @@ def _parse_line_to_step(
         return None
     if stripped.startswith("##"):
         return None
-    tokens = _safe_split(stripped)
-    if not tokens:
+    fields = _step_fields(stripped, expected_kind, default_kind)
+    if fields is None:
         return None
-    kind = _classify_kind(tokens[0], default_kind)
-    if expected_kind and kind != expected_kind:
-        kind = expected_kind
-    jobstore = _extract_jobstore(tokens)
-    root = _extract_root(tokens, kind)
-    log_file = _extract_log_file(tokens)
-    out_files = _extract_outputs(tokens, kind)
+    kind, jobstore, out_files, root, log_file = fields
     return Step(
         raw=stripped,
         kind=kind,
         jobstore=jobstore,
-        out_files=out_files,
+        out_files=list(out_files),
         root=root,
         log_file=log_file,
     )
 
 
+@lru_cache(maxsize=8192)
+def _step_fields(
+    command: str,
+    expected_kind: Optional[str],
+    default_kind: Optional[str],
+) -> Optional[tuple[str, Optional[str], tuple[str, ...], Optional[str], Optional[str]]]:
+    """Split *command* and extract the Step fields; cached per line, so re-parsing an edited
+    script only re-tokenises the lines that changed."""
+
+    tokens = _safe_split(command)
+    if not tokens:
+        return None
+    kind = _classify_kind(tokens[0], default_kind)
+    if expected_kind and kind != expected_kind:
+        kind = expected_kind
+    jobstore = _extract_jobstore(tokens)
+    root = _extract_root(tokens, kind)
+    log_file = _extract_log_file(tokens)
+    out_files = tuple(_extract_outputs(tokens, kind))
+    return kind, jobstore, out_files, root, log_file
+
+
 def _safe_split(command: str) -> List[str]:
     try:
         return shlex.split(command)
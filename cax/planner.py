@@ -1,10 +1,11 @@
 """Translate plans into executable command sequences."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 import shlex
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 
 from .models import Plan, Round, Step
 from . import tree_utils
@@ -29,50 +30,77 @@ class PlannedCommand:
         return shlex.join(self.command)
 
 
+class CommandPlan(list[PlannedCommand]):
+    """Ordered planner output, indexed by category and round while it is built.
+
+    It is still a plain list for iteration, ``len`` and positional access; the indexes
+    are filled in at construction, so treat the result as read-only.
+    """
+
+    __slots__ = ("by_category", "by_round")
+
+    def __init__(self, commands: Iterable[PlannedCommand] = ()) -> None:
+        super().__init__(commands)
+        self.by_category: dict[str, list[PlannedCommand]] = {}
+        self.by_round: dict[str, list[PlannedCommand]] = {}
+        for command in self:
+            self.by_category.setdefault(command.category, []).append(command)
+            if command.round_name is not None:
+                self.by_round.setdefault(command.round_name, []).append(command)
+
+
 def build_execution_plan(
     plan: Plan,
     base_dir: Optional[Path] = None,
     thread_count: Optional[int] = None,
-) -> list[PlannedCommand]:
+) -> CommandPlan:
     """Materialise the full list of commands that should be executed."""
 
+    return CommandPlan(iter_execution_plan(plan, base_dir, thread_count))
+
+
+def iter_execution_plan(
+    plan: Plan,
+    base_dir: Optional[Path] = None,
+    thread_count: Optional[int] = None,
+) -> Iterator[PlannedCommand]:
+    """Yield the plan's commands in execution order without materialising the list.
+
+    Useful for callers that stop at the first match (``any``/``next``); the alignment
+    tree is still built up front.
+    """
+
     base_dir = base_dir or Path.cwd()
-    commands: list[PlannedCommand] = []
     tree = tree_utils.build_alignment_tree(plan, base_dir=base_dir)
+    ancestry = _ramax_ancestry(tree)
 
     for step in plan.preprocess:
-        commands.append(
-            _from_step(
-                step,
-                category="preprocess",
-                base_dir=base_dir,
-                thread_count=thread_count,
-            )
+        yield _from_step(
+            step,
+            category="preprocess",
+            base_dir=base_dir,
+            thread_count=thread_count,
         )
 
     for round_entry in plan.rounds:
-        if _is_absorbed_by_subtree_ramax(round_entry, tree):
+        if _is_absorbed_by_subtree_ramax(round_entry, tree, ancestry):
             # Ancestor subtree-mode RaMAx already covers this round; skip all steps here.
             continue
-        if _is_descendant_ramax(round_entry, tree):
+        if _is_descendant_ramax(round_entry, tree, ancestry):
             # An ancestor already uses RaMAx; running it again here would be redundant.
             continue
-        commands.extend(_round_commands(plan, round_entry, base_dir, thread_count))
+        yield from _round_commands(plan, round_entry, base_dir, thread_count)
 
     for step in plan.hal_merges:
-        if _skip_halmerge_for_ramax_parent(step, tree):
+        if _skip_halmerge_for_ramax_parent(step, tree, ancestry):
             continue
-        commands.append(
-            _from_step(
-                step,
-                category="halmerge",
-                base_dir=base_dir,
-                thread_count=thread_count,
-            )
+        yield _from_step(
+            step,
+            category="halmerge",
+            base_dir=base_dir,
+            thread_count=thread_count,
         )
 
-    return commands
-
 
 def _round_commands(
     plan: Plan,
@@ -219,10 +247,16 @@ def _resolve_path(path: Path, base_dir: Path) -> Path:
 
 
 def _split_command(raw: str) -> List[str]:
+    # Callers may extend the result, so hand out a fresh list each time.
+    return list(_split_command_cached(raw))
+
+
+@lru_cache(maxsize=4096)
+def _split_command_cached(raw: str) -> tuple[str, ...]:
     try:
-        return shlex.split(raw)
+        return tuple(shlex.split(raw))
     except ValueError:
-        return raw.split()
+        return tuple(raw.split())
 
 
 def _normalize_hal2fasta(command: List[str]) -> List[str]:
@@ -308,24 +342,74 @@ def _has_flag(command: List[str], flag: str) -> bool:
     return False
 
 
-def _is_descendant_ramax(round_entry: Round, tree: Optional[tree_utils.AlignmentTree]) -> bool:
+@dataclass
+class _RamaxAncestry:
+    """Ancestor round bitmasks gathered in a single top-down pass.
+
+    Every node carrying a round gets one bit. ``ancestors`` ORs the bits of all rounds above a
+    node and ``parent_round`` holds the bit of the nearest one, so each query is one AND
+    against ``ramax_mask`` or ``subtree_mask``.
+    """
+
+    ancestors: dict[tree_utils.AlignmentNode, int] = field(default_factory=dict)
+    parent_round: dict[tree_utils.AlignmentNode, int] = field(default_factory=dict)
+    ramax_mask: int = 0
+    subtree_mask: int = 0
+
+    def under_ramax(self, node: tree_utils.AlignmentNode) -> bool:
+        return bool(self.ancestors.get(node, 0) & self.ramax_mask)
+
+    def under_subtree(self, node: tree_utils.AlignmentNode) -> bool:
+        return bool(self.ancestors.get(node, 0) & self.subtree_mask)
+
+    def parent_round_ramax(self, node: tree_utils.AlignmentNode) -> bool:
+        return bool(self.parent_round.get(node, 0) & self.ramax_mask)
+
+
+def _ramax_ancestry(tree: Optional[tree_utils.AlignmentTree]) -> Optional[_RamaxAncestry]:
+    """Number round nodes and record their ancestor masks once instead of walking parents per query."""
+
+    if tree is None:
+        return None
+    ancestry = _RamaxAncestry()
+    next_bit = 1
+    stack: list[tuple[tree_utils.AlignmentNode, int, int]] = [(tree.root, 0, 0)]
+    while stack:
+        node, above, parent_bit = stack.pop()
+        ancestry.ancestors[node] = above
+        ancestry.parent_round[node] = parent_bit
+        round_entry = node.round
+        if round_entry is not None:
+            bit = next_bit
+            next_bit <<= 1
+            if round_entry.replace_with_ramax:
+                ancestry.ramax_mask |= bit
+                if SUBTREE_FLAG in round_entry.ramax_opts:
+                    ancestry.subtree_mask |= bit
+            above |= bit
+            parent_bit = bit
+        for child in node.children:
+            stack.append((child, above, parent_bit))
+    return ancestry
+
+
+def _is_descendant_ramax(
+    round_entry: Round,
+    tree: Optional[tree_utils.AlignmentTree],
+    ancestry: Optional[_RamaxAncestry],
+) -> bool:
     """Skip this round when any ancestor round already uses RaMAx and this round also requests RaMAx, avoiding duplicate alignments."""
 
-    if tree is None or not round_entry.replace_with_ramax:
+    if tree is None or ancestry is None or not round_entry.replace_with_ramax:
         return False
     node = tree.find(round_entry.root)
-    if node is None:
-        return False
-    ancestor = node.parent
-    while ancestor:
-        if ancestor.round and ancestor.round.replace_with_ramax:
-            return True
-        ancestor = ancestor.parent
-    return False
+    return node is not None and ancestry.under_ramax(node)
 
 
 def _is_absorbed_by_subtree_ramax(
-    round_entry: Round, tree: Optional[tree_utils.AlignmentTree]
+    round_entry: Round,
+    tree: Optional[tree_utils.AlignmentTree],
+    ancestry: Optional[_RamaxAncestry],
 ) -> bool:
     """Return True when an ancestor round is in subtree-mode RaMAx, so this round should be skipped entirely.
 
@@ -334,32 +418,21 @@ def _is_absorbed_by_subtree_ramax(
     either once the ancestor covers the subtree.
     """
 
-    if tree is None:
+    if tree is None or ancestry is None:
         return False
     node = tree.find(round_entry.root)
-    if node is None:
-        return False
-    ancestor = node.parent
-    while ancestor:
-        if ancestor.round and ancestor.round.replace_with_ramax:
-            if SUBTREE_FLAG in ancestor.round.ramax_opts:
-                return True
-        ancestor = ancestor.parent
-    return False
+    return node is not None and ancestry.under_subtree(node)
 
 
-def _skip_halmerge_for_ramax_parent(step: Step, tree: Optional[tree_utils.AlignmentTree]) -> bool:
+def _skip_halmerge_for_ramax_parent(
+    step: Step,
+    tree: Optional[tree_utils.AlignmentTree],
+    ancestry: Optional[_RamaxAncestry],
+) -> bool:
     """Skip halAppendSubtree when its parent round was produced by RaMAx to avoid writing HAL twice."""
 
-    if tree is None or step.root is None:
+    if tree is None or ancestry is None or step.root is None:
         return False
     node = tree.find(step.root)
-    if node is None:
-        return False
-    # Find the nearest ancestor with a round; that node is the halmerge target parent.
-    parent = node.parent
-    while parent and parent.round is None:
-        parent = parent.parent
-    if parent and parent.round and parent.round.replace_with_ramax:
-        return True
-    return False
+    # The nearest ancestor with a round is the halmerge target parent.
+    return node is not None and ancestry.parent_round_ramax(node)
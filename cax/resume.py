@@ -7,14 +7,23 @@ from __future__ import annotations
 import hashlib
 import json
 import gzip
+import mmap
+import os
+import re
 import shlex
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Optional
 
 from rich.panel import Panel
 from rich.table import Table
 
+try:  # 可选依赖（pip install cactus-ramax[fast]）；未安装时使用标准库 json
+    import orjson
+except ImportError:
+    orjson = None
+
 from . import planner
 from .models import Plan
 
@@ -23,6 +32,9 @@ STATUS_PENDING = "Pending"
 STATUS_COMPLETED = "Completed"
 STATUS_RERUN = "Rerun"
 
+# FASTA 头部行的第一个字段（与 `line[1:].split()[0]` 等价）。
+_FASTA_HEADER_RE = re.compile(rb"^>[ \t]*(\S+)", re.MULTILINE)
+
 
 @dataclass
 class ResumePreview:
@@ -102,14 +114,15 @@ def preview_resume(
     plan_matches = data.get("plan_signature") == current_sig
     entries = index_state_commands(data.get("commands", {}))
 
-    skipped_indices = _prefix_skipped_indices(commands, entries, base)
+    dir_cache: dict[Path, frozenset[str]] = {}
+    skipped_indices = _prefix_skipped_indices(commands, entries, base, dir_cache)
     completed: list[str] = []
     failed: list[str] = []
     missing_outputs: list[str] = []
 
     for idx, cmd in enumerate(commands):
         entry = entries.get(command_stable_key(cmd))
-        outputs_ok = outputs_exist(cmd, base)
+        outputs_ok = outputs_exist(cmd, base, dir_cache)
         if idx in skipped_indices:
             completed.append(cmd.display_name)
             continue
@@ -149,12 +162,13 @@ def command_rows(
     state_path = log_root / "run_state.json"
     data = load_run_state_file(state_path)
     entries = index_state_commands(data.get("commands", {}) if data else {})
-    skipped_indices = _prefix_skipped_indices(commands, entries, base)
+    dir_cache: dict[Path, frozenset[str]] = {}
+    skipped_indices = _prefix_skipped_indices(commands, entries, base, dir_cache)
 
     rows: list[CommandRow] = []
     for idx, cmd in enumerate(commands):
         entry = entries.get(command_stable_key(cmd))
-        outputs_ok = outputs_exist(cmd, base)
+        outputs_ok = outputs_exist(cmd, base, dir_cache)
         status = STATUS_PENDING
         note = ""
 
@@ -220,7 +234,17 @@ def render_command_table(rows: list[CommandRow], *, limit: int = 200) -> Table:
 
 # ---- shared helpers -----------------------------------------------------
 
-def outputs_exist(command: planner.PlannedCommand, base_dir: Path) -> bool:
+def outputs_exist(
+    command: planner.PlannedCommand,
+    base_dir: Path,
+    dir_cache: Optional[dict[Path, frozenset[str]]] = None,
+) -> bool:
+    """检查命令的产物是否存在。
+
+    传入 ``dir_cache`` 时，同一目录只 scandir 一次，后续产物检查变成集合查找；
+    缓存只应在一次预览/跳过计算内复用，避免看到过期的目录内容。
+    """
+
     step = command.step
     if step is None or not step.out_files:
         return True
@@ -230,7 +254,7 @@ def outputs_exist(command: planner.PlannedCommand, base_dir: Path) -> bool:
         if not path.is_absolute():
             path = (base_dir / path).resolve()
         resolved.append(path)
-        if not path.exists():
+        if not _path_exists(path, dir_cache):
             return False
     if step.kind == "blast":
         paf_paths = [p for p in resolved if p.name.endswith(".paf")]
@@ -239,36 +263,81 @@ def outputs_exist(command: planner.PlannedCommand, base_dir: Path) -> bool:
     return True
 
 
+def _path_exists(path: Path, dir_cache: Optional[dict[Path, frozenset[str]]]) -> bool:
+    if dir_cache is None:
+        return path.exists()
+    parent = path.parent
+    names = dir_cache.get(parent)
+    if names is None:
+        try:
+            with os.scandir(parent) as entries:
+                # 符号链接可能悬空，交给 exists() 判断。
+                names = frozenset(entry.name for entry in entries if not entry.is_symlink())
+        except OSError:
+            names = frozenset()
+        dir_cache[parent] = names
+    if path.name in names:
+        return True
+    return path.exists()
+
+
 def load_run_state_file(path: Path) -> dict[str, Any]:
     if not path.exists():
         return {}
     try:
+        if orjson is not None:
+            return orjson.loads(path.read_bytes())
         text = path.read_text(encoding="utf-8")
         return json.loads(text)
     except (OSError, json.JSONDecodeError):
         return {}
 
+
+def write_run_state_file(path: Path, state: dict[str, Any]) -> None:
+    """原子写入 run_state.json（2 空格缩进、保留非 ASCII）。
+
+    runner 写入的状态只含字符串、整数、布尔、None 与嵌套 dict，此时 orjson 与 json 的输出逐字节一致；
+    浮点数的格式两者不同（如 ``1e-05`` 与 ``1e-5``），不要往状态里放浮点数。
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    if orjson is not None:
+        tmp_path.write_bytes(orjson.dumps(state, option=orjson.OPT_INDENT_2))
+    else:
+        tmp_path.write_text(json.dumps(state, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(path)
+
+
 def plan_signature(
     commands: list[planner.PlannedCommand],
     base_dir: Path,
     thread_count: Optional[int],
 ) -> str:
-    hasher = hashlib.sha1()
-    hasher.update(str(base_dir).encode())
-    hasher.update(str(thread_count or "").encode())
-    for cmd in commands:
-        hasher.update(cmd.shell_preview().encode())
-        if cmd.workdir:
-            hasher.update(str(cmd.workdir).encode())
-    return hasher.hexdigest()
+    # preview_resume 与 PlanRunner 会对同一计划各算一次签名；以命令 token 为键缓存，
+    # 第二次只需构造元组并查表，省去逐条 shlex.join 与哈希。
+    key = tuple((tuple(cmd.command), cmd.workdir) for cmd in commands)
+    return _plan_signature_cached(str(base_dir), thread_count, key)
+
+
+@lru_cache(maxsize=32)
+def _plan_signature_cached(
+    base_dir: str,
+    thread_count: Optional[int],
+    commands: tuple[tuple[tuple[str, ...], Optional[Path]], ...],
+) -> str:
+    # 拼接后一次性哈希，结果与逐段 update 相同，保证与已有 run_state.json 兼容。
+    parts = [base_dir, str(thread_count or "")]
+    for tokens, workdir in commands:
+        parts.append(shlex.join(tokens))
+        if workdir:
+            parts.append(str(workdir))
+    return hashlib.sha1("".join(parts).encode()).hexdigest()
 
 
+@lru_cache(maxsize=4096)
 def _stable_key(display_name: str, canonical_preview: str) -> str:
-    hasher = hashlib.sha1()
-    hasher.update(display_name.encode())
-    hasher.update(b"\0")
-    hasher.update(canonical_preview.encode())
-    return hasher.hexdigest()
+    return hashlib.sha1(f"{display_name}\0{canonical_preview}".encode()).hexdigest()
 
 
 def _strip_flag(tokens: list[str], flag: str) -> list[str]:
@@ -352,6 +421,7 @@ def _prefix_skipped_indices(
     commands: list[planner.PlannedCommand],
     entries: dict[str, dict[str, Any]],
     base_dir: Path,
+    dir_cache: Optional[dict[Path, frozenset[str]]] = None,
 ) -> set[int]:
     """只跳过“前缀连续已完成步骤”。
 
@@ -362,7 +432,7 @@ def _prefix_skipped_indices(
     skipped: set[int] = set()
     for idx, cmd in enumerate(commands):
         entry = entries.get(command_stable_key(cmd))
-        if entry and entry.get("status") == "success" and outputs_exist(cmd, base_dir):
+        if entry and entry.get("status") == "success" and outputs_exist(cmd, base_dir, dir_cache):
             skipped.add(idx)
             continue
         break
@@ -471,20 +541,48 @@ def _parse_paf_name(name: str) -> tuple[str | None, str | None]:
 
 
 def _fasta_contains_all_contigs(path: Path, contigs: set[str]) -> bool:
-    remaining = set(contigs)
-    if not remaining:
+    if not contigs:
         return True
     try:
-        opener = gzip.open if path.name.endswith(".gz") else open
-        with opener(path, "rt", encoding="utf-8", errors="replace") as handle:
-            for line in handle:
-                if not line.startswith(">"):
-                    continue
-                header = line[1:].strip().split()[0]
-                if header in remaining:
-                    remaining.remove(header)
-                    if not remaining:
-                        return True
+        st = path.stat()
     except OSError:
         return False
+    return _fasta_has_contigs(str(path), st.st_mtime_ns, st.st_size, frozenset(contigs))
+
+
+@lru_cache(maxsize=256)
+def _fasta_has_contigs(path: str, mtime_ns: int, size: int, contigs: frozenset[str]) -> bool:
+    """扫描 FASTA 头部直到抽样的 contig 全部出现；只缓存布尔结果，按 (路径, mtime, 大小, 抽样) 失效。"""
+
+    _ = mtime_ns  # 仅用于缓存失效
+    remaining = {contig.encode("utf-8") for contig in contigs}
+    try:
+        if path.endswith(".gz"):
+            with gzip.open(path, "rb") as handle:
+                for line in handle:
+                    match = _FASTA_HEADER_RE.match(line)
+                    if match:
+                        remaining.discard(match.group(1))
+                        if not remaining:
+                            return True
+            return False
+        if size == 0:
+            return False
+        with open(path, "rb") as handle:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                # 用 find 在行首 '>' 之间跳跃（底层为 memchr），序列内容不经过正则引擎。
+                pos = 0
+                if buffer[:1] != b">":
+                    found = buffer.find(b"\n>")
+                    pos = found + 1 if found != -1 else -1
+                while pos >= 0:
+                    match = _FASTA_HEADER_RE.match(buffer, pos)
+                    if match:
+                        remaining.discard(match.group(1))
+                        if not remaining:
+                            return True
+                    found = buffer.find(b"\n>", pos)
+                    pos = found + 1 if found != -1 else -1
+    except (OSError, ValueError):
+        return False
     return False
@@ -1,8 +1,12 @@
 """Utilities for parsing cactus alignment trees and mapping them to plan rounds."""
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
+import re
+import sys
 from typing import Iterator, Optional
 
 from .models import Plan, Round
@@ -12,7 +16,7 @@ class NewickParseError(RuntimeError):
     """Raised when a Newick tree cannot be parsed correctly."""
 
 
-@dataclass(eq=False)
+@dataclass(eq=False, slots=True)
 class AlignmentNode:
     """Node within the cactus alignment tree."""
 
@@ -24,26 +28,70 @@ class AlignmentNode:
     support: Optional[float] = None
 
     def walk(self) -> Iterator["AlignmentNode"]:
-        """Yield this node and all descendants."""
+        """Yield this node and all descendants (pre-order)."""
 
-        yield self
-        for child in self.children:
-            yield from child.walk()
+        # Explicit stack: nested ``yield from`` costs O(depth) per node on deep trees.
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
 
     def iter_rounds(self) -> Iterator[Round]:
         """Iterate over all rounds contained within this subtree."""
 
-        if self.round is not None:
-            yield self.round
-        for child in self.children:
-            yield from child.iter_rounds()
+        for node in self.walk():
+            if node.round is not None:
+                yield node.round
 
     def has_round(self) -> bool:
         """Return ``True`` if this subtree contains at least one round."""
 
-        if self.round is not None:
-            return True
-        return any(child.has_round() for child in self.children)
+        return any(node.round is not None for node in self.walk())
+
+
+@dataclass(slots=True)
+class FlatTree:
+    """Pre-order array view of a tree, for bulk queries that do not need the object graph.
+
+    ``parent[i]`` is the index of ``nodes[i]``'s parent (-1 for the root), and the subtree of
+    ``nodes[i]`` is the contiguous slice ``nodes[i:i + size[i]]``.
+    """
+
+    nodes: list[AlignmentNode]
+    parent: array
+    size: array
+    index: dict[AlignmentNode, int]
+
+    def subtree(self, node: AlignmentNode) -> list[AlignmentNode]:
+        """Return *node* and all of its descendants."""
+
+        i = self.index[node]
+        return self.nodes[i : i + self.size[i]]
+
+    def ancestors(self, node: AlignmentNode) -> Iterator[AlignmentNode]:
+        """Yield the ancestors of *node*, nearest first."""
+
+        i = self.parent[self.index[node]]
+        while i >= 0:
+            yield self.nodes[i]
+            i = self.parent[i]
+
+
+def flatten(root: AlignmentNode) -> FlatTree:
+    """Build a :class:`FlatTree` for the subtree under *root* in one walk."""
+
+    nodes = list(root.walk())
+    index = {node: i for i, node in enumerate(nodes)}
+    parent = array("i", [-1]) * len(nodes)
+    size = array("i", [1]) * len(nodes)
+    for i, node in enumerate(nodes):
+        for child in node.children:
+            parent[index[child]] = i
+    # Children always follow their parent in pre-order, so one reverse pass sums subtree sizes.
+    for i in range(len(nodes) - 1, 0, -1):
+        size[parent[i]] += size[i]
+    return FlatTree(nodes=nodes, parent=parent, size=size, index=index)
 
 
 @dataclass
@@ -51,12 +99,36 @@ class AlignmentTree:
     """Full cactus alignment tree rooted at ``root``."""
 
     root: AlignmentNode
-    nodes_by_name: dict[str, AlignmentNode] = field(init=False, repr=False)
+    _name_index: Optional[dict[str, AlignmentNode]] = field(default=None, init=False, repr=False)
+    _rounds: Optional[list[Round]] = field(default=None, init=False, repr=False)
+    _flat: Optional[FlatTree] = field(default=None, init=False, repr=False)
+
+    @property
+    def nodes_by_name(self) -> dict[str, AlignmentNode]:
+        """Name -> node index, built by one walk on first use."""
+
+        if self._name_index is None:
+            self._name_index = {node.name: node for node in self.root.walk() if node.name}
+        return self._name_index
+
+    def invalidate_index(self) -> None:
+        """Drop the cached indexes after adding, removing or renaming nodes."""
 
-    def __post_init__(self) -> None:
-        self.nodes_by_name = {
-            node.name: node for node in self.root.walk() if node.name
-        }
+        self._name_index = None
+        self._rounds = None
+        self._flat = None
+
+    @property
+    def flat(self) -> FlatTree:
+        """Pre-order array view of the tree, built on first use.
+
+        The view is a snapshot: after changing ``children`` directly, call
+        ``invalidate_index()`` before reading it again.
+        """
+
+        if self._flat is None:
+            self._flat = flatten(self.root)
+        return self._flat
 
     def find(self, name: str) -> Optional[AlignmentNode]:
         """Return the node with the given ``name`` if present."""
@@ -64,9 +136,11 @@ class AlignmentTree:
         return self.nodes_by_name.get(name)
 
     def iter_rounds(self) -> Iterator[Round]:
-        """Iterate over rounds contained in the tree."""
+        """Iterate over rounds contained in the tree (pre-order, collected on first use)."""
 
-        return self.root.iter_rounds()
+        if self._rounds is None:
+            self._rounds = list(self.root.iter_rounds())
+        return iter(self._rounds)
 
 
 def build_alignment_tree(plan: Plan, base_dir: Optional[Path] = None) -> Optional[AlignmentTree]:
@@ -79,14 +153,16 @@ def build_alignment_tree(plan: Plan, base_dir: Optional[Path] = None) -> Optiona
     newick = _read_newick(plan, base_dir=base_dir)
     if not newick:
         return None
-    parser = _NewickParser(newick)
-    try:
-        root = parser.parse()
-    except NewickParseError:
+    shape = _parse_newick_shape(newick)
+    if shape is None:
         return None
+    root = _thaw(shape)
     round_map = {round_entry.root: round_entry for round_entry in plan.rounds}
-    _attach_rounds(root, round_map)
-    _attach_orphans_to_root(root, round_map)
+    unmatched = _attach_rounds(root, round_map)
+    # Usually every round names a Newick node; the orphan fallback only runs when one does not
+    # (e.g. an unnamed outermost node), which the attach_orphan_root tests exercise.
+    if unmatched:
+        _attach_orphans_to_root(root, unmatched)
     return AlignmentTree(root)
 
 
@@ -135,28 +211,88 @@ def _resolve_path(path_like: str, base_dir: Optional[Path]) -> Path:
 
 
 def _read_first_nonempty_line(path: Path) -> str | None:
-    if not path.exists():
+    try:
+        st = path.stat()
+    except OSError:
         return None
+    return _first_nonempty_line(str(path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=128)
+def _first_nonempty_line(path: str, mtime_ns: int, size: int) -> str | None:
+    """Read the first non-empty line; keyed on (path, mtime, size) so an unchanged file is read once."""
+
+    _ = mtime_ns, size  # cache key only
     try:
-        with path.open("r", encoding="utf-8") as handle:
+        with open(path, "r", encoding="utf-8") as handle:
             for line in handle:
                 stripped = line.strip()
                 if stripped:
                     return stripped
-    except OSError:
+    except (OSError, UnicodeDecodeError):
+        # Fallback candidates can be any file named on the command line, including binaries.
         return None
     return None
 
 
-def _attach_rounds(node: AlignmentNode, round_map: dict[str, Round]) -> None:
-    if node.name in round_map:
-        node.round = round_map[node.name]
-    for child in node.children:
-        child.parent = node
-        _attach_rounds(child, round_map)
+# Immutable snapshot of a parsed node: (name, length, support, children).
+_NodeShape = tuple[str, Optional[float], Optional[float], tuple["_NodeShape", ...]]
 
 
-def _attach_orphans_to_root(root: AlignmentNode, round_map: dict[str, Round]) -> None:
+@lru_cache(maxsize=128)
+def _parse_newick_shape(newick: str) -> Optional[_NodeShape]:
+    """Parse *newick* once and keep an immutable snapshot; ``None`` when it is not valid Newick.
+
+    Callers attach rounds to (and the UI mutates) the returned nodes, so each build gets fresh
+    nodes from :func:`_thaw` instead of sharing a parsed tree.
+    """
+
+    try:
+        root = _NewickParser(newick).parse()
+    except NewickParseError:
+        return None
+    frozen: dict[int, _NodeShape] = {}
+    stack: list[tuple[AlignmentNode, bool]] = [(root, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if children_done:
+            children = tuple(frozen.pop(id(child)) for child in node.children)
+            frozen[id(node)] = (node.name, node.length, node.support, children)
+            continue
+        stack.append((node, True))
+        stack.extend((child, False) for child in node.children)
+    return frozen[id(root)]
+
+
+def _thaw(shape: _NodeShape) -> AlignmentNode:
+    name, length, support, children = shape
+    root = AlignmentNode(name=name, length=length, support=support)
+    stack: list[tuple[AlignmentNode, tuple[_NodeShape, ...]]] = [(root, children)]
+    while stack:
+        parent, child_shapes = stack.pop()
+        for name, length, support, grandchildren in child_shapes:
+            child = AlignmentNode(name=name, length=length, support=support, parent=parent)
+            parent.children.append(child)
+            if grandchildren:
+                stack.append((child, grandchildren))
+    return root
+
+
+def _attach_rounds(root: AlignmentNode, round_map: dict[str, Round]) -> list[Round]:
+    """Attach rounds to nodes by name; return the rounds no node matched, in plan order."""
+
+    unmatched = dict(round_map)
+    for node in root.walk():
+        round_entry = round_map.get(node.name)
+        if round_entry is not None:
+            node.round = round_entry
+            unmatched.pop(node.name, None)
+        for child in node.children:
+            child.parent = node
+    return list(unmatched.values())
+
+
+def _attach_orphans_to_root(root: AlignmentNode, unmatched: list[Round]) -> None:
     """Attach a single unmatched round to an unnamed root so it can be toggled in the UI.
 
     Some cactus-prepare outputs leave the outermost Newick node unnamed, while the last
@@ -165,16 +301,6 @@ def _attach_orphans_to_root(root: AlignmentNode, round_map: dict[str, Round]) ->
     logic intact.
     """
 
-    attached_roots: set[str] = set()
-
-    def _collect(node: AlignmentNode) -> None:
-        if node.round:
-            attached_roots.add(node.round.root)
-        for child in node.children:
-            _collect(child)
-
-    _collect(root)
-    unmatched = [rnd for rnd in round_map.values() if rnd.root not in attached_roots]
     if len(unmatched) == 1 and root.round is None and (not root.name):
         root.round = unmatched.pop()
 
@@ -187,100 +313,96 @@ def _attach_orphans_to_root(root: AlignmentNode, round_map: dict[str, Round]) ->
             root.children.append(child)
 
 
+# One token per match: a delimiter, a ``:length`` suffix, or a label. Whitespace is never matched.
+_NEWICK_TOKEN_RE = re.compile(r"[(),;]|:[^,();\s]*|[^:,();\s]+")
+
+
 class _NewickParser:
-    """Minimal recursive-descent parser for Newick tree strings."""
+    """Minimal Newick parser: regex tokenizer plus an explicit stack of open clades."""
 
     def __init__(self, text: str):
         self.text = text.strip()
-        self.length = len(self.text)
+        self.tokens: list[str] = _NEWICK_TOKEN_RE.findall(self.text)
         self.index = 0
 
     def parse(self) -> AlignmentNode:
-        node = self._parse_subtree()
-        self._skip_ws()
-        if self._peek() == ";":
-            self.index += 1
-        self._skip_ws()
-        if self.index != self.length:
-            raise NewickParseError(f"Unexpected trailing data at position {self.index}")
-        return node
+        open_clades: list[list[AlignmentNode]] = []
+        while True:
+            if self._peek() == "(":
+                self.index += 1
+                open_clades.append([])
+                continue
 
-    def _parse_subtree(self) -> AlignmentNode:
-        self._skip_ws()
-        if self._peek() == "(":
-            self.index += 1
-            children: list[AlignmentNode] = []
-            while True:
-                children.append(self._parse_subtree())
-                self._skip_ws()
-                token = self._peek()
-                if token == ",":
-                    self.index += 1
-                    continue
-                if token == ")":
-                    self.index += 1
-                    break
-                raise NewickParseError(f"Expected ',' or ')' at position {self.index}")
             label = self._parse_label()
+            if not label:
+                raise NewickParseError(f"Missing leaf label at position {self._position()}")
             length = self._parse_branch_length_value()
-            name, support = self._split_name_support(label, internal=True)
-            node = AlignmentNode(name=name or "", children=children, length=length, support=support)
-            for child in children:
-                child.parent = node
-            return node
-
-        label = self._parse_label()
-        if not label:
-            raise NewickParseError(f"Missing leaf label at position {self.index}")
-        length = self._parse_branch_length_value()
-        name, _ = self._split_name_support(label, internal=False)
-        return AlignmentNode(name=name, length=length)
-
-    def _parse_label(self) -> str:
-        self._skip_ws()
-        start = self.index
-        while self.index < self.length:
-            char = self.text[self.index]
-            if char in ":,();":
-                break
-            if char.isspace():
+            name, _ = self._split_name_support(label, internal=False)
+            node = AlignmentNode(name=sys.intern(name), length=length)
+
+            # Close as many clades as the following ')' tokens allow.
+            while open_clades and self._peek() == ")":
+                self.index += 1
+                children = open_clades.pop()
+                children.append(node)
+                label = self._parse_label()
+                length = self._parse_branch_length_value()
+                name, support = self._split_name_support(label, internal=True)
+                node = AlignmentNode(name=sys.intern(name or ""), children=children, length=length, support=support)
+                for child in children:
+                    child.parent = node
+            if not open_clades:
                 break
+            if self._peek() != ",":
+                raise NewickParseError(f"Expected ',' or ')' at position {self._position()}")
+            self.index += 1
+            open_clades[-1].append(node)
+
+        if self._peek() == ";":
             self.index += 1
-        label = self.text[start:self.index].strip()
-        self._skip_ws()
-        return label
+        if self.index != len(self.tokens):
+            raise NewickParseError(f"Unexpected trailing data at position {self._position()}")
+        return node
+
+    def _parse_label(self) -> str:
+        token = self._peek()
+        if token is None or token[0] in "(),;:":
+            return ""
+        self.index += 1
+        return token
 
     def _parse_branch_length_value(self) -> Optional[float]:
-        self._skip_ws()
-        if self._peek() != ":":
+        token = self._peek()
+        if token is None or token[0] != ":":
             return None
         self.index += 1
-        start = self.index
-        while self.index < self.length and self.text[self.index] not in ",(); \t\r\n":
-            self.index += 1
-        token = self.text[start:self.index].strip()
-        self._skip_ws()
-        if not token:
+        value = token[1:]
+        if not value:
             return None
         try:
-            return float(token)
+            return float(value)
         except ValueError:
             return None
 
     def _split_name_support(self, label: str, internal: bool) -> tuple[str, Optional[float]]:
         text = (label or "").strip()
-        if internal and text and all(ch.isdigit() or ch == "." for ch in text):
+        # Same test as "every char is a digit or '.'", done by str methods in C.
+        if internal and text and (text.replace(".", "").isdigit() or not text.strip(".")):
             try:
                 return "", float(text)
             except ValueError:
                 return "", None
         return text, None
 
-    def _skip_ws(self) -> None:
-        while self.index < self.length and self.text[self.index].isspace():
-            self.index += 1
-
     def _peek(self) -> str | None:
-        if self.index >= self.length:
+        if self.index >= len(self.tokens):
             return None
-        return self.text[self.index]
+        return self.tokens[self.index]
+
+    def _position(self) -> int:
+        """Character offset of the current token, recomputed only for error messages."""
+
+        for idx, match in enumerate(_NEWICK_TOKEN_RE.finditer(self.text)):
+            if idx == self.index:
+                return match.start()
+        return len(self.text)
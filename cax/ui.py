@@ -1,14 +1,17 @@
 """Textual-based interactive UI for configuring CAX plans."""
 from __future__ import annotations
 
+from functools import lru_cache
 import itertools
 import math
+import re
 import shlex
 import shutil
 import subprocess
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, Iterable, Optional
+from types import MappingProxyType
+from typing import Callable, Iterable, Mapping, Optional
 
 import psutil
 from textual import events
@@ -18,6 +21,7 @@ from textual.containers import Container, Horizontal, Vertical
 from textual.screen import ModalScreen, Screen
 from textual.widgets import Button, Checkbox, Footer, Header, Input, ListItem, ListView, Static, TextArea
 
+from rich.cells import cell_len
 from rich.console import Console, Group, RenderableType
 from rich.panel import Panel
 from rich.table import Table
@@ -28,11 +32,36 @@ from rich.console import Group
 
 from . import planner, resume as resume_utils, tree_utils
 from .models import Plan, Round, RunSettings, Step
-from .planner import PlannedCommand
+from .planner import CommandPlan, PlannedCommand
 
 
 SUBTREE_MODE_FLAG = "--subtree-mode"
 
+_GLYPHS_ASCII: Mapping[str, str] = MappingProxyType(
+    {
+        "h": "-",
+        "v": "|",
+        "tee": "+",
+        "elbow": "+",
+        "top": "+",
+        "dot": "*",
+        "lite": "o",
+        "parent": "O",
+    }
+)
+_GLYPHS_UNICODE: Mapping[str, str] = MappingProxyType(
+    {
+        "h": "─",
+        "v": "│",
+        "tee": "├─",
+        "elbow": "└─",
+        "top": "┌─",
+        "dot": "●",
+        "lite": "○",
+        "parent": "◈",
+    }
+)
+
 
 def _is_subtree_mode_round(round_entry: Round) -> bool:
     return round_entry.replace_with_ramax and SUBTREE_MODE_FLAG in round_entry.ramax_opts
@@ -159,15 +188,21 @@ def environment_summary_card(environment: dict[str, Optional[str]], resources: d
 def render_run_script(plan: Plan, commands: Iterable[PlannedCommand]) -> str:
     """Generate a bash script for the execution plan."""
 
-    lines = ["#!/usr/bin/env bash", "set -euo pipefail", "", "# Generated from cactus-prepare plan"]
+    parts = ["#!/usr/bin/env bash\nset -euo pipefail\n\n# Generated from cactus-prepare plan\n"]
+    extend = parts.extend
     for command in commands:
-        lines.append(f"# {command.display_name}")
-        lines.append(shlex.join(command.command))
-        lines.append("")
-    script = "\n".join(lines).rstrip() + "\n"
+        extend((f"# {command.display_name}\n", _join_command(tuple(command.command)), "\n\n"))
+    script = "".join(parts).rstrip() + "\n"
     return script
 
 
+@lru_cache(maxsize=4096)
+def _join_command(tokens: tuple[str, ...]) -> str:
+    """Shell-quote *tokens*; memoized so re-rendering unchanged commands is cheap."""
+
+    return shlex.join(tokens)
+
+
 
 
 class CommandSelectionModal(ModalScreen[CommandTarget | None]):
@@ -450,13 +485,17 @@ class AsciiPhylo(Static):
         Binding("shift+n", "search_prev", show=False),
     ]
 
-    def __init__(self, root: tree_utils.AlignmentNode, *, id: str = "ascii-phylo"):
+    def __init__(self, tree: tree_utils.AlignmentTree, *, id: str = "ascii-phylo"):
         super().__init__("", id=id)
-        self._root = root
+        self._tree = tree
+        # Nodes may have been appended directly since the tree was built; start from a fresh view.
+        tree.invalidate_index()
+        self._root = root = tree.root
         self._cursor = root
         self._stack: list[tree_utils.AlignmentNode] = []
         self._mode = "clado"
         self._ascii_only = False
+        self._glyphs_cache: Mapping[str, str] = _GLYPHS_ASCII if self._ascii_only else _GLYPHS_UNICODE
         self._scale_x = 1.0  # Controls horizontal/vertical scaling.
         self._x_gap = 6  # Leaf spacing on the horizontal grid.
         self._view_x = 0
@@ -603,33 +642,28 @@ class AsciiPhylo(Static):
         Check if any ancestor is in Subtree Mode. If so, disable that mode to allow node-level edits.
         Returns True if an ancestor was modified (reverted), signaling the caller to stop.
         """
-        current = getattr(node, "parent", None)
-        ancestor_conflict: tree_utils.AlignmentNode | None = None
-        
-        while current:
-            if current.round and current.round.replace_with_ramax:
-                if "--subtree-mode" in current.round.ramax_opts:
-                    ancestor_conflict = current
-                    break
-            current = getattr(current, "parent", None)
-            
-        if not ancestor_conflict:
+        # One walk up the ancestor chain; every subtree-mode ancestor would still absorb this node,
+        # so all of them are reverted together rather than one per toggle.
+        conflicts: list[tree_utils.AlignmentNode] = []
+        for current in self._tree.flat.ancestors(node):
+            round_entry = current.round
+            if round_entry and round_entry.replace_with_ramax and "--subtree-mode" in round_entry.ramax_opts:
+                conflicts.append(current)
+
+        if not conflicts:
             return False
 
-        # Revert the ancestor's Subtree Mode
-        if ancestor_conflict.round:
-            ancestor_conflict.round.ramax_opts.remove("--subtree-mode")
-            # Option: also disable RaMAx entirely? 
-            # "Cancel the replacement" implies setting replace_with_ramax = False?
-            # Let's stick to degrading to Node Mode first, as it's safer.
-            # But user said: "直接取消这个大子树的替换" -> replace_with_ramax = False
-            ancestor_conflict.round.replace_with_ramax = False
+        # "直接取消这个大子树的替换": drop Subtree Mode and the RaMAx replacement itself.
+        for ancestor in conflicts:
+            ancestor.round.ramax_opts.remove("--subtree-mode")
+            ancestor.round.replace_with_ramax = False
 
+        names = ", ".join(f"'{ancestor.name}'" for ancestor in conflicts)
         self._rebuild_visual()
         self.refresh()
         self._notify(
             node,
-            f"Conflict: Subtree mode on ancestor '{ancestor_conflict.name}' has been disabled.",
+            f"Conflict: Subtree mode on ancestor {names} has been disabled.",
         )
         
         # Show modal
@@ -643,7 +677,7 @@ class AsciiPhylo(Static):
                 InfoModal(
                     "Subtree Mode Disabled",
                     (
-                        f"The ancestor node '{ancestor_conflict.name}' was in Subtree Mode.\n\n"
+                        f"The ancestor node {names} was in Subtree Mode.\n\n"
                         "Since you are modifying a child node independently, the ancestor's "
                         "subtree-wide replacement has been cancelled to avoid conflicts."
                     ),
@@ -696,16 +730,8 @@ class AsciiPhylo(Static):
         return not node.children and node.round is None
 
     def _collect_subtree_nodes(self, node: tree_utils.AlignmentNode) -> set[tree_utils.AlignmentNode]:
-        nodes: set[tree_utils.AlignmentNode] = set()
-        stack = [node]
-        while stack:
-            current = stack.pop()
-            if current in nodes:
-                continue
-            nodes.add(current)
-            for child in self._ordered_children.get(current, current.children):
-                stack.append(child)
-        return nodes
+        # 先序数组中子树是连续切片，无需逐层遍历。
+        return set(self._tree.flat.subtree(node))
 
     def _collect_round_nodes(self, node: tree_utils.AlignmentNode) -> set[tree_utils.AlignmentNode]:
         if node is None:
@@ -744,29 +770,18 @@ class AsciiPhylo(Static):
             self.update("No tree structure found")
             return
         size_map: dict[tree_utils.AlignmentNode, int] = {}
-
-        def compute_size(node: tree_utils.AlignmentNode) -> int:
-            total = 1
-            for child in node.children:
-                total += compute_size(child)
-            size_map[node] = total
-            return total
-
-        compute_size(self._root)
-
         self._ordered_children.clear()
 
-        def order_children(node: tree_utils.AlignmentNode) -> None:
-            ordered = sorted(
-                node.children,
-                key=lambda c: size_map.get(c, 1),
-                reverse=True,
-            )
-            self._ordered_children[node] = ordered
-            for child in ordered:
-                order_children(child)
-
-        order_children(self._root)
+        # 单次迭代后序遍历：子树规模算完即可为该节点排序子节点（大子树在前），不再递归两遍。
+        stack: list[tuple[tree_utils.AlignmentNode, bool]] = [(self._root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if not children_done:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children)
+                continue
+            size_map[node] = 1 + sum(size_map[child] for child in node.children)
+            self._ordered_children[node] = sorted(node.children, key=size_map.__getitem__, reverse=True)
 
         self._y_map.clear()
         self._x_map.clear()
@@ -851,28 +866,8 @@ class AsciiPhylo(Static):
         self._view_x = max(0, min(self._view_x, max_x))
         self._view_y = max(0, min(self._view_y, max_y))
 
-    def _glyphs(self) -> dict[str, str]:
-        if self._ascii_only:
-            return {
-                "h": "-",
-                "v": "|",
-                "tee": "+",
-                "elbow": "+",
-                "top": "+",
-                "dot": "*",
-                "lite": "o",
-                "parent": "O",
-            }
-        return {
-            "h": "─",
-            "v": "│",
-            "tee": "├─",
-            "elbow": "└─",
-            "top": "┌─",
-            "dot": "●",
-            "lite": "○",
-            "parent": "◈",
-        }
+    def _glyphs(self) -> Mapping[str, str]:
+        return self._glyphs_cache
 
     def _compute_states(self) -> None:
         self._state_cache.clear()
@@ -923,7 +918,7 @@ class AsciiPhylo(Static):
         return None
 
     def _rebuild_visual(self) -> None:
-        glyphs = self._glyphs()
+        glyphs = self._glyphs_cache
         highlight_subtree = self._toggle_scope == "subtree"
         highlighted_nodes: set[tree_utils.AlignmentNode] = set()
         if highlight_subtree and self._cursor:
@@ -958,7 +953,9 @@ class AsciiPhylo(Static):
         space = "    "
 
         # Pass 1: Build base lines and calculate max width
-        raw_lines: list[tuple[Text, tree_utils.AlignmentNode]] = []
+        # Each line is kept as (text, style) segments plus its cell width so pass 2 can
+        # stream everything into a single Text without per-line Text objects.
+        raw_lines: list[tuple[list[tuple[str, str]], int, tree_utils.AlignmentNode]] = []
         self._x_map.clear()
         self._y_map.clear()
         max_width = 0
@@ -982,51 +979,48 @@ class AsciiPhylo(Static):
                 indicator_char = "❚" # Golden bar
                 indicator_style = "#fcbf49"
 
-            line = Text()
-            line.append(indicator_char, style=indicator_style)
+            segments: list[tuple[str, str]] = [(indicator_char, indicator_style)]
             
             # Prefix carries the vertical indentation from ancestors; render it with a uniform cool-gray style.
-            line.append(prefix, style="#6272a4")
+            segments.append((prefix, "#6272a4"))
             if connector:
-                line.append(connector, style="#6272a4")
+                segments.append((connector, "#6272a4"))
             
             label_text = label_for(node)
-            display_text_object = Text()
 
             # --- Scheme A: Cursor Highlight ---
             if node is self._cursor:
                 # High-contrast background (bright purple) and bold brackets
-                display_text_object.append(f"【 {icon}{label_text} 】", style="bold #1e1e2e on #bd93f9")
+                segments.append((f"【 {icon}{label_text} 】", "bold #1e1e2e on #bd93f9"))
             
             # --- Scheme A: RaMAx State ---
             elif node.round and effective_ramax.get(node, False):
-                display_text_object.append(f"{icon}{label_text}", style="bold #1e1e2e on #fcbf49")
+                segments.append((f"{icon}{label_text}", "bold #1e1e2e on #fcbf49"))
             
             # --- Scheme A: Subtree Scope Highlight ---
             elif highlight_subtree and node in highlighted_nodes:
                 if self._ascii_only:
-                    display_text_object.append(f"[ {icon}{label_text} ]", style="bold #1e1e2e on #94a3b8")
+                    segments.append((f"[ {icon}{label_text} ]", "bold #1e1e2e on #94a3b8"))
                 else:
-                    display_text_object.append(f"〔 {icon}{label_text} 〕", style="bold #1e1e2e on #2d3b55")
+                    segments.append((f"〔 {icon}{label_text} 〕", "bold #1e1e2e on #2d3b55"))
             
             # --- Default: Leaf vs Ancestor Distinction ---
             elif not node.children:
                 # Leaf: Green, lighter weight
-                display_text_object.append(f"{icon}{label_text}", style="#a6e3a1") 
+                segments.append((f"{icon}{label_text}", "#a6e3a1"))
             else:
                 # Ancestor: Blue, Bold
-                display_text_object.append(f"{icon}{label_text}", style="bold #89b4fa")
-            
-            line.append(display_text_object)
+                segments.append((f"{icon}{label_text}", "bold #89b4fa"))
 
+            line_width = cell_len("".join(text for text, _ in segments))
             nonlocal max_width
-            max_width = max(max_width, line.cell_len)
+            max_width = max(max_width, line_width)
             
             y = len(raw_lines)
             x = len(prefix) + (0 if depth == 0 else len(connector))
             self._x_map[node] = x
             self._y_map[node] = y
-            raw_lines.append((line, node))
+            raw_lines.append((segments, line_width, node))
 
             children = self._ordered_children.get(node, [])
             for idx, child in enumerate(children):
@@ -1036,33 +1030,44 @@ class AsciiPhylo(Static):
 
         walk(self._root, "", True, 0)
 
-        # Pass 2: Add dotted leader and branch length
-        final_lines: list[Text] = []
+        # Pass 2: Add dotted leader and branch length, writing straight into one Text
+        rendered = Text()
+        append = rendered.append
         target_width = max_width + 4 # Reserve gap
-
-        for line, node in raw_lines:
+        content_width = 0
+
+        for index, (segments, line_width, node) in enumerate(raw_lines):
+            if index:
+                append("\n")
+            for text, style in segments:
+                append(text, style=style)
+            plain_len = sum(len(text) for text, _ in segments)
             if node.length is not None:
-                current_len = line.cell_len
-                padding = max(2, target_width - current_len)
+                padding = max(2, target_width - line_width)
                 dots = "." * padding
                 len_str = f" {node.length:.4g}"
                 
                 # Append dotted leader and length
-                line.append(dots, style="#6272a4")
-                line.append(len_str, style="bold cyan")
-            final_lines.append(line)
+                append(dots, style="#6272a4")
+                append(len_str, style="bold cyan")
+                plain_len += padding + len(len_str)
+            content_width = max(content_width, plain_len)
 
         self._linear = sorted(self._y_map.keys(), key=lambda n: (self._y_map[n], self._x_map[n]))
-        self._content_height = len(final_lines)
-        self._content_width = max((len(t.plain) for t in final_lines), default=0)
+        self._content_height = len(raw_lines)
+        self._content_width = content_width
         self._view_x = 0
         self._view_y = 0
-        self._visual = Text("\n").join(final_lines)
+        self._visual = rendered
 
     def render(self) -> Text:  # type: ignore[override]
         return self._visual
 
 
+_ROUND_PICKER_BATCH = 30
+_ROUND_PICKER_MARGIN = 5
+
+
 class RoundPickerModal(ModalScreen[int | None]):
     """Modal dialog for picking a round when no node is focused."""
 
@@ -1093,17 +1098,24 @@ class RoundPickerModal(ModalScreen[int | None]):
         super().__init__()
         self.rounds = rounds
         self._list: ListView | None = None
+        # Labels are cheap; ListItems are mounted in batches as the highlight nears the end.
+        self._labels: list[Text] = []
+        for round_entry in rounds:
+            label = Text(round_entry.name, style="bold")
+            label.append(f" ({round_entry.root})")
+            label.append("\n")
+            label.append(round_entry.target_hal)
+            self._labels.append(label)
+        self._mounted = 0
+
+    def _next_items(self) -> list[ListItem]:
+        start = self._mounted
+        self._mounted = min(len(self._labels), start + _ROUND_PICKER_BATCH)
+        return [ListItem(Static(label, expand=True)) for label in self._labels[start:self._mounted]]
 
     def compose(self) -> ComposeResult:
         with Container(id="round-picker"):
-            items = []
-            for round_entry in self.rounds:
-                label = Text(round_entry.name, style="bold")
-                label.append(f" ({round_entry.root})")
-                label.append("\n")
-                label.append(round_entry.target_hal)
-                items.append(ListItem(Static(label, expand=True)))
-            self._list = ListView(*items, id="round-picker-list")
+            self._list = ListView(*self._next_items(), id="round-picker-list")
             yield self._list
             yield Static("Enter to confirm, Esc to cancel", id="round-picker-hint")
 
@@ -1112,6 +1124,13 @@ class RoundPickerModal(ModalScreen[int | None]):
             self._list.index = 0
             self.set_focus(self._list)
 
+    def on_list_view_highlighted(self, event: ListView.Highlighted) -> None:
+        if self._list is None or self._mounted >= len(self._labels):
+            return
+        index = self._list.index
+        if index is not None and index >= self._mounted - _ROUND_PICKER_MARGIN:
+            self._list.extend(self._next_items())
+
     def on_list_view_selected(self, event: ListView.Selected) -> None:
         self.dismiss(event.index)
 
@@ -1119,6 +1138,10 @@ class RoundPickerModal(ModalScreen[int | None]):
         self.dismiss(None)
 
 
+# Same tag shape Rich's markup parser accepts: "[bold]", "[/bold]", "[/]", "[#ff0000]", "[@click]".
+_STRIP_MARKUP_RE = re.compile(r"\[[a-z#/@][^\[\]]*\]")
+
+
 class DetailBuffer:
     """Stores the latest detail text and mirrors a short summary to the subtitle."""
 
@@ -1126,27 +1149,27 @@ class DetailBuffer:
         self.app = app
         self.text: str = ""
         self.renderable: RenderableType | str = ""
+        self._console = Console(width=120, record=True, color_system=None)
 
     def update(self, message: RenderableType | str) -> None:
         self.renderable = message
         if isinstance(message, str):
             plain = message
         else:
-            # Render rich content into plain text for later inspection.
-            temp_console = Console(width=120, record=True, color_system=None)
-            with temp_console.capture() as capture:
-                temp_console.print(message)
-            plain = capture.get()
+            plain = self._render_plain(message)
         self.text = plain
         summary = plain.splitlines()[0] if plain else ""
-        if summary:
-            try:
-                summary_plain = Text.from_markup(summary).plain
-            except Exception:
-                summary_plain = summary
-        else:
-            summary_plain = ""
-        self.app.sub_title = summary_plain[:80]
+        summary_plain = _STRIP_MARKUP_RE.sub("", summary) if "[" in summary else summary
+        sub_title = summary_plain[:80]
+        if self.app.sub_title != sub_title:
+            self.app.sub_title = sub_title
+
+    def _render_plain(self, message: RenderableType) -> str:
+        """Render rich content into plain text for later inspection."""
+
+        with self._console.capture() as capture:
+            self._console.print(message)
+        return capture.get()
 
 
 class DashboardHUD(Static):
@@ -1548,6 +1571,9 @@ class DashboardHUD(Static):
             return None
         return gpus
 
+_OVERVIEW_CACHE_LIMIT = 16
+
+
 class RunSettingsScreen(Screen[RunSettings | None]):
     """Dedicated screen for confirming run-time configuration."""
 
@@ -1641,6 +1667,7 @@ class RunSettingsScreen(Screen[RunSettings | None]):
         self._verbose: Checkbox | None = None
         self._status: Static | None = None
         self._view_mode: str = "resume" if (resume_available and current.resume) else "flow"  # resume | flow | table
+        self._overview_cache: dict[tuple[bool, Optional[int], bool], RenderableType] = {}
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -1781,7 +1808,18 @@ class RunSettingsScreen(Screen[RunSettings | None]):
             return self._render_resume_overview(settings)
         if self._view_mode == "flow":
             return self._render_flow_overview(settings)
-        return plan_overview(self.plan, run_settings=settings, compact=self.compact)
+        return self._cached_plan_overview(settings)
+
+    def _cached_plan_overview(self, settings: RunSettings) -> RenderableType:
+        # The plan cannot change while this screen is open, so overviews only vary by these settings.
+        key = (settings.verbose, settings.thread_count, self.compact)
+        cached = self._overview_cache.get(key)
+        if cached is None:
+            cached = plan_overview(self.plan, run_settings=settings, compact=self.compact)
+            self._overview_cache[key] = cached
+            if len(self._overview_cache) > _OVERVIEW_CACHE_LIMIT:
+                self._overview_cache.pop(next(iter(self._overview_cache)))
+        return cached
 
     def _render_resume_overview(self, settings: RunSettings) -> RenderableType:
         app = self.app
@@ -1939,15 +1977,42 @@ class RunSettingsScreen(Screen[RunSettings | None]):
             for c in tn.children: get_max_h(c)
         get_max_h(root_tree_node)
 
-        # Pixel buffer: (x, y) -> (char, style)
-        pixels: dict[tuple[int, int], tuple[str, str]] = {}
+        # Flat row-major pixel buffer: index y * grid_w + x -> char / style.
+        grid_w = max_w + 10
+        grid_h = max_h + 10
+        cells: list[str | None] = [None] * (grid_w * grid_h)
+        cell_styles: list[str] = [""] * (grid_w * grid_h)
+        # Per-row occupied column range, so only the drawn region is scanned on output.
+        row_lo = [grid_w] * grid_h
+        row_hi = [-1] * grid_h
 
         def put(x, y, char, style="white"):
-            if 0 <= y < max_h + 10 and 0 <= x < max_w + 10:
-                pixels[(x, y)] = (char, style)
+            if 0 <= y < grid_h and 0 <= x < grid_w:
+                idx = y * grid_w + x
+                cells[idx] = char
+                cell_styles[idx] = style
+                if x < row_lo[y]: row_lo[y] = x
+                if x > row_hi[y]: row_hi[y] = x
+
+        def put_text(x, y, text, style="white"):
+            # One slice store per run instead of a put() per character; clipped like put().
+            if not 0 <= y < grid_h:
+                return
+            lo = max(x, 0)
+            hi = min(x + len(text), grid_w)
+            if lo >= hi:
+                return
+            base = y * grid_w
+            cells[base + lo:base + hi] = text[lo - x:hi - x]
+            cell_styles[base + lo:base + hi] = [style] * (hi - lo)
+            if lo < row_lo[y]: row_lo[y] = lo
+            if hi - 1 > row_hi[y]: row_hi[y] = hi - 1
+
+        half_box = BOX_WIDTH // 2
+        content_space = BOX_WIDTH - 2
 
         def draw_node_recursive(tn: TreeNode):
-            left = tn.x - BOX_WIDTH // 2
+            left = tn.x - half_box
             top = tn.y
             
             is_ramax = tn.round_entry and tn.round_entry.replace_with_ramax
@@ -1978,14 +2043,11 @@ class RunSettingsScreen(Screen[RunSettings | None]):
                 h, v = "─", "│"
             
             # Box Drawing
-            put(left, top, tl, border_color)
-            for i in range(1, BOX_WIDTH-1): put(left+i, top, h, border_color)
-            put(left+BOX_WIDTH-1, top, tr, border_color)
+            put_text(left, top, tl + h * content_space + tr, border_color)
             
             put(left, top+1, v, border_color)
             
             raw_label = tn.name
-            content_space = BOX_WIDTH - 2
             full_str = f"{icon} {raw_label}"
             if len(full_str) > content_space:
                 full_str = f"{icon} {raw_label[:content_space-4]}.."
@@ -1994,15 +2056,11 @@ class RunSettingsScreen(Screen[RunSettings | None]):
             start_x = left + 1 + padding_left
             
             put(start_x, top+1, icon, color)
-            for i, char in enumerate(full_str):
-                if i == 0: continue
-                put(start_x + i, top+1, char, "bold white")
+            put_text(start_x + 1, top+1, full_str[1:], "bold white")
                 
             put(left+BOX_WIDTH-1, top+1, v, border_color)
             
-            put(left, top+2, bl, border_color)
-            for i in range(1, BOX_WIDTH-1): put(left+i, top+2, h, border_color)
-            put(left+BOX_WIDTH-1, top+2, br, border_color)
+            put_text(left, top+2, bl + h * content_space + br, border_color)
 
             # Connections
             if tn.children:
@@ -2011,8 +2069,9 @@ class RunSettingsScreen(Screen[RunSettings | None]):
                 mid_y = top + 3
                 put(tn.x, mid_y, "│", border_color)
                 
-                min_cx = min(c.x for c in tn.children)
-                max_cx = max(c.x for c in tn.children)
+                child_xs = {c.x for c in tn.children}
+                min_cx = min(child_xs)
+                max_cx = max(child_xs)
                 
                 for x in range(min_cx, max_cx + 1):
                     char = "─"
@@ -2022,12 +2081,8 @@ class RunSettingsScreen(Screen[RunSettings | None]):
                     elif x == min_cx: char = "┌"
                     elif x == max_cx: char = "┐"
                     
-                    is_child_stem = any(c.x == x for c in tn.children)
-                    if is_child_stem:
-                        if char == "─": char = "┬"
-                        if char == "┌": char = "┌"
-                        if char == "┐": char = "┐"
-                        if char == "┼": char = "┼"
+                    if char == "─" and x in child_xs:
+                        char = "┬"
                     
                     put(x, mid_y, char, line_style)
 
@@ -2045,27 +2100,40 @@ class RunSettingsScreen(Screen[RunSettings | None]):
 
         draw_node_recursive(root_tree_node)
 
-        if not pixels: return Text("Empty Tree", style="red")
+        used_rows = [y for y in range(grid_h) if row_hi[y] >= 0]
+        if not used_rows: return Text("Empty Tree", style="red")
 
-        sorted_pixels = sorted(pixels.items(), key=lambda item: (item[0][1], item[0][0]))
+        min_x = min(row_lo[y] for y in used_rows)
         final_text = Text()
-        row_map: dict[int, list[tuple[int, str, str]]] = {}
-        
-        for (x, y), (char, style) in sorted_pixels:
-            if y not in row_map: row_map[y] = []
-            row_map[y].append((x, char, style))
-
-        min_x = min(k[0] for k in pixels.keys())
-        
-        for y in sorted(row_map.keys()):
-            row_pixels = row_map[y]
+        # Coalesce adjacent cells sharing a style into one append instead of one span per character.
+        run: list[str] = []
+        run_style = ""
+        for row_number, y in enumerate(used_rows):
+            if run:
+                final_text.append("".join(run), style=run_style)
+                run.clear()
+            if row_number:
+                final_text.append("\n")
             cursor = min_x
-            for x, char, style in row_pixels:
+            base = y * grid_w
+            for idx in range(base + row_lo[y], base + row_hi[y] + 1):
+                char = cells[idx]
+                if char is None:
+                    continue
+                x = idx - base
+                style = cell_styles[idx]
+                if not run or x > cursor or style != run_style:
+                    if run:
+                        final_text.append("".join(run), style=run_style)
+                        run.clear()
+                    run_style = style
                 if x > cursor:
                     final_text.append(" " * (x - cursor))
-                final_text.append(char, style=style)
+                run.append(char)
                 cursor = x + 1
-            final_text.append("\n")
+        if run:
+            final_text.append("".join(run), style=run_style)
+        final_text.append("\n")
 
         return final_text
 
@@ -2145,7 +2213,13 @@ class RamaxOptionsModal(ModalScreen[tuple[list[str], list[str]] | None]):
         self._round_values = list(round_opts)
         self._global_container: Container | None = None
         self._round_container: Container | None = None
+        self._global_inputs: list[Input] = []
+        self._round_inputs: list[Input] = []
+        self._global_empty: Static | None = None
+        self._round_empty: Static | None = None
         self._status: Static | None = None
+        # Removal is asynchronous in Textual, so ids come from a counter rather than list positions.
+        self._input_ids = itertools.count()
 
     def compose(self) -> ComposeResult:
         with Container(id="options-dialog"):
@@ -2178,46 +2252,57 @@ class RamaxOptionsModal(ModalScreen[tuple[list[str], list[str]] | None]):
         if self._global_container:
             for child in list(self._global_container.children):
                 child.remove()
-            if self._global_values:
-                inputs = [
-                    Input(value=value, placeholder="e.g. --threads=8", classes="option-input", id=f"global-{idx}")
-                    for idx, value in enumerate(self._global_values)
-                ]
-                self._global_container.mount(*inputs)
-            else:
-                self._global_container.mount(Static("(no global options)", classes="option-empty"))
+            self._global_empty = Static("(no global options)", classes="option-empty")
+            self._global_inputs = [self._new_input("global", value) for value in self._global_values]
+            self._global_empty.display = not self._global_inputs
+            self._global_container.mount(self._global_empty, *self._global_inputs)
         if self._round_container:
             for child in list(self._round_container.children):
                 child.remove()
-            if self._round_values:
-                inputs = [
-                    Input(value=value, placeholder="e.g. --input {}", classes="option-input", id=f"round-{idx}")
-                    for idx, value in enumerate(self._round_values)
-                ]
-                self._round_container.mount(*inputs)
-            else:
-                self._round_container.mount(Static("(no Round options)", classes="option-empty"))
+            self._round_empty = Static("(no Round options)", classes="option-empty")
+            self._round_inputs = [self._new_input("round", value) for value in self._round_values]
+            self._round_empty.display = not self._round_inputs
+            self._round_container.mount(self._round_empty, *self._round_inputs)
+
+    def _new_input(self, section: str, value: str) -> Input:
+        placeholder = "e.g. --threads=8" if section == "global" else "e.g. --input {}"
+        return Input(
+            value=value,
+            placeholder=placeholder,
+            classes="option-input",
+            id=f"{section}-{next(self._input_ids)}",
+        )
 
-    def _sync_from_inputs(self) -> None:
-        if self._global_container:
-            self._global_values = self._collect_values(self._global_container, strip_empty=False)
-        if self._round_container:
-            self._round_values = self._collect_values(self._round_container, strip_empty=False)
-
-    def _collect_values(self, container: Container, strip_empty: bool) -> list[str]:
-        values: list[str] = []
-        for widget in container.query(Input):
-            value = widget.value if not strip_empty else widget.value.strip()
-            if strip_empty:
-                if value:
-                    values.append(value)
-            else:
-                values.append(value)
-        return values
+    def _append_option(
+        self,
+        section: str,
+        container: Container | None,
+        inputs: list[Input],
+        empty: Static | None,
+    ) -> None:
+        if container is None:
+            return
+        widget = self._new_input(section, "")
+        inputs.append(widget)
+        container.mount(widget)
+        if empty is not None:
+            empty.display = False
+
+    def _remove_last_option(self, inputs: list[Input], empty: Static | None) -> None:
+        if not inputs:
+            return
+        inputs.pop().remove()
+        if not inputs and empty is not None:
+            empty.display = True
+
+    def _collect_values(self, inputs: list[Input], strip_empty: bool) -> list[str]:
+        if not strip_empty:
+            return [widget.value for widget in inputs]
+        return [value for value in (widget.value.strip() for widget in inputs) if value]
 
     def action_save(self) -> None:
-        global_values = self._collect_values(self._global_container, strip_empty=True) if self._global_container else []
-        round_values = self._collect_values(self._round_container, strip_empty=True) if self._round_container else []
+        global_values = self._collect_values(self._global_inputs, strip_empty=True)
+        round_values = self._collect_values(self._round_inputs, strip_empty=True)
         self.dismiss((global_values, round_values))
 
     def action_cancel(self) -> None:
@@ -2231,20 +2316,14 @@ class RamaxOptionsModal(ModalScreen[tuple[list[str], list[str]] | None]):
         if button_id == "cancel-options":
             self.action_cancel()
             return
-        self._sync_from_inputs()
         if button_id == "add-global":
-            self._global_values.append("")
+            self._append_option("global", self._global_container, self._global_inputs, self._global_empty)
         elif button_id == "remove-global":
-            if self._global_values:
-                self._global_values.pop()
+            self._remove_last_option(self._global_inputs, self._global_empty)
         elif button_id == "add-round":
-            self._round_values.append("")
+            self._append_option("round", self._round_container, self._round_inputs, self._round_empty)
         elif button_id == "remove-round":
-            if self._round_values:
-                self._round_values.pop()
-        else:
-            return
-        self._refresh_inputs()
+            self._remove_last_option(self._round_inputs, self._round_empty)
 
 class PlanUIApp(App[UIResult]):
     CSS = """
@@ -2338,12 +2417,15 @@ class PlanUIApp(App[UIResult]):
         self.run_settings = run_settings or RunSettings()
         self.hud: DashboardHUD | None = None
         self._last_detail_text: str = ""
+        self._exec_plan_cache: tuple[tuple, CommandPlan] | None = None
+        self._ramax_cmd_by_round: dict[str, str] = {}
+        self._round_details_cache: dict[tuple, str] = {}
 
     def compose(self) -> ComposeResult:
         yield Header()
         with Container(id="tree-container"):
             if self.alignment_tree:
-                canvas = AsciiPhylo(self.alignment_tree.root)
+                canvas = AsciiPhylo(self.alignment_tree)
                 canvas.set_detail_callback(self._on_node_selected)
                 self.canvas = canvas
                 yield canvas
@@ -2467,26 +2549,44 @@ class PlanUIApp(App[UIResult]):
     def action_quit(self) -> None:
         self.exit(UIResult(plan=self.plan, action="quit", run_settings=self.run_settings))
 
-    def _round_details(self, round_entry: Round) -> list[str]:
-        details = [f"[bold]{round_entry.name}[/bold] root={round_entry.root}"]
+    def _round_details(self, round_entry: Round) -> str:
+        key = (
+            id(round_entry),
+            self._plan_state_key(),
+            round_entry.blast_step.raw if round_entry.blast_step else None,
+            round_entry.align_step.raw if round_entry.align_step else None,
+            tuple(step.raw for step in round_entry.hal2fasta_steps),
+        )
+        cached = self._round_details_cache.get(key)
+        if cached is None:
+            cached = self._build_round_details(round_entry)
+            self._round_details_cache[key] = cached
+            limit = max(2, len(self.plan.rounds) * 2)
+            while len(self._round_details_cache) > limit:
+                self._round_details_cache.pop(next(iter(self._round_details_cache)))
+        return cached
+
+    def _build_round_details(self, round_entry: Round) -> str:
+        parts = [f"[bold]{round_entry.name}[/bold] root={round_entry.root}"]
         if round_entry.replace_with_ramax:
             ramax_preview = self._ramax_command_preview(round_entry)
             if ramax_preview:
-                details.extend(["", "[green]RaMAx command[/green]", ramax_preview])
+                parts += ("", "[green]RaMAx command[/green]", ramax_preview)
         else:
             if round_entry.blast_step:
-                details.extend(["", "[cyan]cactus-blast[/cyan]", round_entry.blast_step.raw])
+                parts += ("", "[cyan]cactus-blast[/cyan]", round_entry.blast_step.raw)
             if round_entry.align_step:
-                details.extend(["", "[cyan]cactus-align[/cyan]", round_entry.align_step.raw])
+                parts += ("", "[cyan]cactus-align[/cyan]", round_entry.align_step.raw)
         if round_entry.hal2fasta_steps:
-            details.append("")
-            details.append("[magenta]hal2fasta[/magenta]")
-            details.extend(step.raw for step in round_entry.hal2fasta_steps)
-        details.append("")
-        details.append("[yellow]RaMAx options[/yellow]")
-        details.append(f"Global: {self._format_option_list(self.plan.global_ramax_opts)}")
-        details.append(f"Round: {self._format_option_list(round_entry.ramax_opts)}")
-        return details
+            parts += ("", "[magenta]hal2fasta[/magenta]")
+            parts += (step.raw for step in round_entry.hal2fasta_steps)
+        parts += (
+            "",
+            "[yellow]RaMAx options[/yellow]",
+            f"Global: {self._format_option_list(self.plan.global_ramax_opts)}",
+            f"Round: {self._format_option_list(round_entry.ramax_opts)}",
+        )
+        return "\n".join(parts)
 
     def _format_option_list(self, options: list[str]) -> str:
         return ", ".join(options) if options else "(empty)"
@@ -2502,10 +2602,10 @@ class PlanUIApp(App[UIResult]):
         round_entry = self.plan.rounds[index]
         details = self._round_details(round_entry)
         if status:
-            details.extend(["", f"[green]{status}[/green]"])
+            details += f"\n\n[green]{status}[/green]"
         border_style = "green" if round_entry.replace_with_ramax else "cyan"
-        panel = Panel("\n".join(details), title=round_entry.name, border_style=border_style, padding=(1, 1))
-        self._last_detail_text = "\n".join(details)
+        panel = Panel(details, title=round_entry.name, border_style=border_style, padding=(1, 1))
+        self._last_detail_text = details
         if self.hud:
             self.hud.update_message(panel)
 
@@ -2568,26 +2668,19 @@ class PlanUIApp(App[UIResult]):
         node: tree_utils.AlignmentNode,
         status: str | None = None,
     ) -> None:
-        details: list[str] = []
         if node.round:
-            details.extend(self._round_details(node.round))
+            details = self._round_details(node.round)
         else:
-            title = node.name or "(unnamed node)"
-            details.append(f"[bold]{title}[/bold]")
+            details = f"[bold]{node.name or '(unnamed node)'}[/bold]"
         subtree_rounds = list(node.iter_rounds())
         if subtree_rounds:
             replaced = sum(1 for round_entry in subtree_rounds if round_entry.replace_with_ramax)
-            details.extend(
-                [
-                    "",
-                    f"Subtree summary: RaMAx {replaced}/{len(subtree_rounds)} rounds",
-                ]
-            )
+            details += f"\n\nSubtree summary: RaMAx {replaced}/{len(subtree_rounds)} rounds"
         else:
-            details.extend(["", "No cactus rounds in this subtree (leaf node)."])
+            details += "\n\nNo cactus rounds in this subtree (leaf node)."
         if status:
-            details.extend(["", f"[green]{status}[/green]"])
-        self._last_detail_text = "\n".join(details)
+            details += f"\n\n[green]{status}[/green]"
+        self._last_detail_text = details
         if self.hud:
             self.hud.update_message(Panel(self._last_detail_text, title=node.round.name if node.round else (node.name or "Node"), border_style="green" if node.round and node.round.replace_with_ramax else "cyan", padding=(1, 1)))
 
@@ -2656,18 +2749,51 @@ class PlanUIApp(App[UIResult]):
         self.run_settings = result
         self.exit(UIResult(plan=self.plan, action="run", run_settings=self.run_settings))
 
+    def _plan_state_key(self) -> tuple:
+        """Snapshot of every plan field that influences the generated RaMAx commands."""
+
+        return (
+            self.run_settings.thread_count,
+            self.plan.out_seq_file,
+            self.plan.out_dir,
+            tuple(self.plan.global_ramax_opts),
+            tuple(
+                (
+                    r.name,
+                    r.root,
+                    r.target_hal,
+                    r.workdir,
+                    r.replace_with_ramax,
+                    r.manual_ramax_command,
+                    tuple(r.ramax_opts),
+                )
+                for r in self.plan.rounds
+            ),
+        )
+
+    def _execution_plan(self) -> CommandPlan:
+        """Return the planner output for the current plan state, rebuilding only when it changed."""
+
+        key = self._plan_state_key()
+        if self._exec_plan_cache is None or self._exec_plan_cache[0] != key:
+            commands = planner.build_execution_plan(
+                self.plan,
+                self.base_dir,
+                thread_count=self.run_settings.thread_count,
+            )
+            self._exec_plan_cache = (key, commands)
+            ramax_by_round: dict[str, str] = {}
+            for command in commands.by_category.get("ramax", ()):
+                if command.round_name not in ramax_by_round:
+                    ramax_by_round[command.round_name] = command.shell_preview()
+            self._ramax_cmd_by_round = ramax_by_round
+        return self._exec_plan_cache[1]
+
     def _ramax_command_preview(self, round_entry: Round) -> str:
         if round_entry.manual_ramax_command:
             return round_entry.manual_ramax_command
-        commands = planner.build_execution_plan(
-            self.plan,
-            self.base_dir,
-            thread_count=self.run_settings.thread_count,
-        )
-        for command in commands:
-            if command.is_ramax and command.round_name == round_entry.name:
-                return command.shell_preview()
-        return ""
+        self._execution_plan()
+        return self._ramax_cmd_by_round.get(round_entry.name, "")
 
 
 def launch(
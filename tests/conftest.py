@@ -0,0 +1,219 @@
+"""Shared fixtures for the runner/resume tests."""
+import os
+import shlex
+import sys
+from pathlib import Path
+
+import pytest
+
+
+# Stubs run on the current interpreter directly: no PATH lookup of python3 (possibly a slow
+# version-manager shim) and no site import (-S), since they only need the standard library.
+# A /bin/sh wrapper execs it, so interpreter paths with spaces or beyond the shebang length
+# limit still work.
+_WRAPPER = '#!/bin/sh\nexec {python} -S {script} "$@"\n'
+
+# Stub executables keyed by mode. Each mode gets its own directory, so a test picks the
+# behaviour it needs through PATH and the scripts are written once per session.
+_STUBS: dict[str, tuple[str, str]] = {
+    "preprocess-counter": (
+        "cactus-preprocess",
+        """import os
+import sys
+from pathlib import Path
+
+out = None
+for arg in sys.argv[1:]:
+    if arg.endswith(".txt"):
+        out = arg
+        break
+out = out or "count.txt"
+p = Path(out)
+fd = os.open(p, os.O_RDWR | os.O_CREAT, 0o644)
+n = int(os.read(fd, 32) or b"0")
+os.pwrite(fd, str(n + 1).encode(), 0)
+os.close(fd)
+""",
+    ),
+    "ramax-counter": (
+        "ramax",
+        """import os
+import sys
+from pathlib import Path
+
+out = None
+for i, arg in enumerate(sys.argv[1:]):
+    if arg == "-o" and i + 2 <= len(sys.argv[1:]):
+        out = sys.argv[1:][i + 1]
+        break
+    if arg.startswith("-o="):
+        out = arg.split("=", 1)[1]
+        break
+
+out = out or "out.hal"
+Path(out).write_text("ok")
+
+counter = Path("ramax-count.txt")
+fd = os.open(counter, os.O_RDWR | os.O_CREAT, 0o644)
+n = int(os.read(fd, 32) or b"0")
+os.pwrite(fd, str(n + 1).encode(), 0)
+os.close(fd)
+""",
+    ),
+    "blast-requires-restart": (
+        "cactus-blast",
+        """import sys
+from pathlib import Path
+
+jobstore = Path(sys.argv[1])
+jobstore.mkdir(parents=True, exist_ok=True)
+(jobstore / "files" / "shared").mkdir(parents=True, exist_ok=True)
+(jobstore / "files" / "shared" / "rootJobStoreID").write_text("ok")
+
+args = " ".join(sys.argv[1:])
+Path("seen-args.txt").write_text(args)
+
+if "--restart" not in sys.argv:
+    sys.exit(1)
+
+out = next((a for a in sys.argv[1:] if a.endswith(".paf")), None)
+if out:
+    Path(out).write_text("ok")
+sys.exit(0)
+""",
+    ),
+    "blast-requires-clean-jobstore": (
+        "cactus-blast",
+        """import os
+import sys
+from pathlib import Path
+
+jobstore = Path(sys.argv[1])
+if jobstore.exists():
+    # Runner should have cleaned it when rerunning a previously-successful step.
+    sys.exit(2)
+if "--restart" in sys.argv:
+    sys.exit(3)
+
+jobstore.mkdir(parents=True, exist_ok=True)
+out = next((a for a in sys.argv[1:] if a.endswith(".paf")), None)
+if out:
+    Path(out).write_text("ok")
+
+counter = Path("blast-count.txt")
+fd = os.open(counter, os.O_RDWR | os.O_CREAT, 0o644)
+n = int(os.read(fd, 32) or b"0")
+os.pwrite(fd, str(n + 1).encode(), 0)
+os.close(fd)
+sys.exit(0)
+""",
+    ),
+    "blast-corrupt-jobstore": (
+        "cactus-blast",
+        """import sys
+from pathlib import Path
+
+jobstore = Path(sys.argv[1])
+
+# 若 runner 未在启动前清理，直接失败。
+if jobstore.exists():
+    sys.exit(2)
+if "--restart" in sys.argv:
+    sys.exit(3)
+
+marker = Path("first-run.txt")
+if not marker.exists():
+    # 第一次：制造一个“看似存在但不完整”的 jobStore（缺少 rootJobStoreID），并失败
+    (jobstore / "files" / "shared").mkdir(parents=True, exist_ok=True)
+    (jobstore / "files" / "shared" / "config.pickle").write_text("x")
+    marker.write_text("1")
+    sys.exit(1)
+
+out = next((a for a in sys.argv[1:] if a.endswith(".paf")), None)
+if out:
+    Path(out).write_text("ok")
+sys.exit(0)
+""",
+    ),
+    "blast-fails-first-run": (
+        "cactus-blast",
+        """import sys
+from pathlib import Path
+
+jobstore = Path(sys.argv[1])
+Path("seen-args.txt").write_text(" ".join(sys.argv[1:]))
+
+marker = Path("first-run.txt")
+if not marker.exists():
+    (jobstore / "files" / "shared").mkdir(parents=True, exist_ok=True)
+    (jobstore / "files" / "shared" / "rootJobStoreID").write_text("ok")
+    marker.write_text("1")
+    sys.exit(1)
+
+if jobstore.exists():
+    sys.exit(2)
+if "--restart" in sys.argv:
+    sys.exit(3)
+
+(jobstore / "files" / "shared").mkdir(parents=True, exist_ok=True)
+(jobstore / "files" / "shared" / "rootJobStoreID").write_text("ok")
+
+out = next((a for a in sys.argv[1:] if a.endswith(".paf")), None)
+if out:
+    Path(out).write_text("ok")
+sys.exit(0)
+""",
+    ),
+    "blast-stale-paf": (
+        "cactus-blast",
+        """import os
+import sys
+from pathlib import Path
+
+counter = Path("blast-count.txt")
+fd = os.open(counter, os.O_RDWR | os.O_CREAT, 0o644)
+n = int(os.read(fd, 32) or b"0")
+os.pwrite(fd, str(n + 1).encode(), 0)
+os.close(fd)
+
+out = sys.argv[3] if len(sys.argv) > 3 else "out.paf"
+
+# 故意写一个“与 FASTA 不一致”的 PAF：A 的 contig 写成 A.chr1，但 FASTA 里只有 ArefChr0
+Path(out).write_text(
+    "id=B|BrefChr0\\t4\\t0\\t4\\t+\\tid=A|A.chr1\\t4\\t0\\t4\\t4\\t4\\t60\\n",
+    encoding="utf-8",
+)
+sys.exit(0)
+""",
+    ),
+}
+
+
+def _write_executable(path: Path, content: str) -> None:
+    # Create with the executable mode directly instead of write_text + stat + chmod.
+    fd = os.open(path, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o755)
+    try:
+        os.write(fd, content.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+@pytest.fixture(scope="session")
+def stub_bin_dir(tmp_path_factory) -> Path:
+    root = tmp_path_factory.mktemp("stub_bin")
+    for mode, (name, script) in _STUBS.items():
+        mode_dir = root / mode
+        mode_dir.mkdir()
+        script_path = mode_dir / f"{name}.py"
+        script_path.write_text(script)
+        wrapper = _WRAPPER.format(python=shlex.quote(sys.executable), script=shlex.quote(str(script_path)))
+        _write_executable(mode_dir / name, wrapper)
+    return root
+
+
+@pytest.fixture
+def stub_env(stub_bin_dir: Path):
+    def _env(mode: str) -> dict[str, str]:
+        return {"PATH": f"{stub_bin_dir / mode}{os.pathsep}{os.environ.get('PATH', '')}"}
+
+    return _env
@@ -28,7 +28,7 @@ def test_subtree_flag_not_passed_to_ramax(tmp_path: Path):
     )
 
     commands = planner.build_execution_plan(plan, base_dir=tmp_path)
-    ramax_cmd = next(cmd for cmd in commands if cmd.is_ramax)
+    ramax_cmd = commands.by_category["ramax"][0]
 
     assert "--subtree-mode" not in ramax_cmd.command
     assert "--threads" in ramax_cmd.command
@@ -41,3 +41,11 @@ def test_subtree_mode_skips_descendant_rounds(tmp_path: Path):
     # Only the ancestor RaMAx command should remain; descendant rounds are absorbed.
     assert any(cmd.is_ramax and cmd.round_name == "Anc0" for cmd in commands)
     assert not any(cmd.round_name == "Anc1" for cmd in commands)
+
+
+def test_iter_execution_plan_matches_built_plan(tmp_path: Path):
+    plan = _plan(tmp_path)
+
+    streamed = planner.iter_execution_plan(plan, base_dir=tmp_path)
+
+    assert list(streamed) == list(planner.build_execution_plan(plan, base_dir=tmp_path))
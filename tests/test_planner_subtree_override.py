@@ -25,12 +25,12 @@ def test_descendant_cactus_runs_when_ancestor_ramax(tmp_path):
 
     commands = planner.build_execution_plan(plan, base_dir=tmp_path)
 
-    mr_cmds = [cmd for cmd in commands if cmd.round_name == mr_round.name]
+    mr_cmds = commands.by_round.get(mr_round.name, [])
     assert mr_cmds, "mr subtree should not be skipped just because an ancestor uses RaMAx"
     assert {"blast", "align"}.issubset({cmd.category for cmd in mr_cmds})
 
     anc0_round = next(r for r in plan.rounds if r.root == "Anc0")
-    anc0_cmds = [cmd for cmd in commands if cmd.round_name == anc0_round.name]
+    anc0_cmds = commands.by_round.get(anc0_round.name, [])
     assert any(cmd.is_ramax for cmd in anc0_cmds), "root round should still run with RaMAx"
 
 
@@ -45,5 +45,5 @@ def test_descendant_ramax_skipped_when_ancestor_ramax(tmp_path):
 
     commands = planner.build_execution_plan(plan, base_dir=tmp_path)
 
-    anc1_cmds = [cmd for cmd in commands if cmd.round_name == anc1.name]
+    anc1_cmds = commands.by_round.get(anc1.name, [])
     assert not anc1_cmds, "child RaMAx should be skipped when its ancestor already runs RaMAx"
@@ -1,5 +1,5 @@
-import os
-import stat
+import shlex
+import sys
 from datetime import datetime
 from pathlib import Path
 
@@ -7,33 +7,12 @@ from cax.models import Plan, PrepareHeader, Round, RunSettings, Step
 from cax.runner import PlanRunner
 from cax.resume import preview_resume
 
+# Launch the running interpreter directly; a PATH lookup of "python" may hit a slow shim.
+PYTHON = shlex.quote(sys.executable)
 
-def _write_executable(path: Path, content: str) -> None:
-    path.write_text(content, encoding="utf-8")
-    path.chmod(path.stat().st_mode | stat.S_IEXEC)
-
-
-def test_resume_skips_even_when_threads_change_for_cactus_commands(tmp_path: Path):
-    bin_dir = tmp_path / "bin"
-    bin_dir.mkdir()
-    _write_executable(
-        bin_dir / "cactus-preprocess",
-        """#!/usr/bin/env python3
-import sys
-from pathlib import Path
 
-out = None
-for arg in sys.argv[1:]:
-    if arg.endswith(".txt"):
-        out = arg
-        break
-out = out or "count.txt"
-p = Path(out)
-n = int(p.read_text()) if p.exists() else 0
-p.write_text(str(n + 1))
-""",
-    )
-    env = {"PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"}
+def test_resume_skips_even_when_threads_change_for_cactus_commands(tmp_path: Path, stub_env):
+    env = stub_env("preprocess-counter")
 
     header = PrepareHeader(generated_by="cactus-prepare --outSeqFile seq.fa --outDir out", date=datetime.now())
     step = Step(raw="cactus-preprocess count.txt", kind="preprocess", out_files=["count.txt"])
@@ -74,14 +53,14 @@ def test_resume_keeps_skipping_completed_steps_when_future_step_changes(tmp_path
     header = PrepareHeader(generated_by="cactus-prepare --outSeqFile seq.fa --outDir out", date=datetime.now())
     step1 = Step(
         raw=(
-            "python -c \"from pathlib import Path; p=Path('count.txt'); "
-            "n=int(p.read_text()) if p.exists() else 0; p.write_text(str(n+1))\""
+            f"{PYTHON} -c \"import os; fd=os.open('count.txt', os.O_RDWR|os.O_CREAT, 0o644); "
+            "n=int(os.read(fd, 32) or b'0'); os.pwrite(fd, str(n+1).encode(), 0); os.close(fd)\""
         ),
         kind="preprocess",
         out_files=["count.txt"],
     )
     step2 = Step(
-        raw="python -c \"from pathlib import Path; Path('marker.txt').write_text('v1')\"",
+        raw=f"{PYTHON} -c \"from pathlib import Path; Path('marker.txt').write_text('v1')\"",
         kind="preprocess",
         out_files=["marker.txt"],
     )
@@ -100,7 +79,7 @@ def test_resume_keeps_skipping_completed_steps_when_future_step_changes(tmp_path
     assert (tmp_path / "marker.txt").read_text() == "v1"
 
     # 微调后续步骤命令（模拟用户编辑待执行/后续步骤），应不影响已完成步骤的跳过。
-    step2.raw = "python -c \"from pathlib import Path; Path('marker.txt').write_text('v2')\""
+    step2.raw = f"{PYTHON} -c \"from pathlib import Path; Path('marker.txt').write_text('v2')\""
     runner = PlanRunner(plan, base_dir=tmp_path, run_settings=RunSettings(verbose=False, resume=True))
     runner.run()
 
@@ -108,33 +87,8 @@ def test_resume_keeps_skipping_completed_steps_when_future_step_changes(tmp_path
     assert (tmp_path / "marker.txt").read_text() == "v2"  # 第二步按新命令重跑
 
 
-def test_resume_reruns_ramax_when_output_missing(tmp_path: Path):
-    bin_dir = tmp_path / "bin"
-    bin_dir.mkdir()
-    _write_executable(
-        bin_dir / "ramax",
-        """#!/usr/bin/env python3
-import sys
-from pathlib import Path
-
-out = None
-for i, arg in enumerate(sys.argv[1:]):
-    if arg == "-o" and i + 2 <= len(sys.argv[1:]):
-        out = sys.argv[1:][i + 1]
-        break
-    if arg.startswith("-o="):
-        out = arg.split("=", 1)[1]
-        break
-
-out = out or "out.hal"
-Path(out).write_text("ok")
-
-counter = Path("ramax-count.txt")
-n = int(counter.read_text()) if counter.exists() else 0
-counter.write_text(str(n + 1))
-""",
-    )
-    env = {"PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"}
+def test_resume_reruns_ramax_when_output_missing(tmp_path: Path, stub_env):
+    env = stub_env("ramax-counter")
 
     header = PrepareHeader(generated_by="cactus-prepare --outSeqFile seq.fa --outDir out", date=datetime.now())
     round1 = Round(
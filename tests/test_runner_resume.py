@@ -1,5 +1,6 @@
-import os
-import stat
+import json
+import shlex
+import sys
 from datetime import datetime
 from pathlib import Path
 
@@ -7,7 +8,10 @@ import pytest
 
 from cax.models import Plan, PrepareHeader, Round, RunSettings, Step
 from cax.runner import PlanRunner
-from cax.resume import preview_resume
+from cax.resume import preview_resume, write_run_state_file
+
+# Launch the running interpreter directly; a PATH lookup of "python" may hit a slow shim.
+PYTHON = shlex.quote(sys.executable)
 
 
 def _build_plan(tmp_path: Path) -> Plan:
@@ -17,15 +21,15 @@ def _build_plan(tmp_path: Path) -> Plan:
     )
     step1 = Step(
         raw=(
-            "python -c \"from pathlib import Path; p=Path('count.txt'); "
-            "n=int(p.read_text()) if p.exists() else 0; p.write_text(str(n+1))\""
+            f"{PYTHON} -c \"import os; fd=os.open('count.txt', os.O_RDWR|os.O_CREAT, 0o644); "
+            "n=int(os.read(fd, 32) or b'0'); os.pwrite(fd, str(n+1).encode(), 0); os.close(fd)\""
         ),
         kind="blast",
         out_files=["count.txt"],
         root="root1",
     )
     step2 = Step(
-        raw="python -c \"from pathlib import Path; Path('marker.txt').write_text('ok')\"",
+        raw=f"{PYTHON} -c \"from pathlib import Path; Path('marker.txt').write_text('ok')\"",
         kind="align",
         out_files=["marker.txt"],
         root="root1",
@@ -47,11 +51,6 @@ def _build_plan(tmp_path: Path) -> Plan:
     )
 
 
-def _write_executable(path: Path, content: str) -> None:
-    path.write_text(content, encoding="utf-8")
-    path.chmod(path.stat().st_mode | stat.S_IEXEC)
-
-
 def test_resume_skips_completed_steps(tmp_path):
     plan = _build_plan(tmp_path)
     runner = PlanRunner(plan, base_dir=tmp_path, run_settings=RunSettings(verbose=False, resume=True))
@@ -95,44 +94,34 @@ def test_preview_resume_reports_completed_and_pending(tmp_path):
     assert "align-root1" in preview.missing_outputs
 
 
-def test_preview_resume_detects_signature_mismatch(tmp_path):
+def test_preview_resume_refreshes_when_outputs_change(tmp_path):
     plan = _build_plan(tmp_path)
     runner = PlanRunner(plan, base_dir=tmp_path, run_settings=RunSettings(verbose=False, resume=True))
     runner.run()
 
-    preview = preview_resume(plan, base_dir=tmp_path, thread_count=8)
+    first = preview_resume(plan, base_dir=tmp_path)
+    assert first is not None
+    assert "align-root1" not in first.missing_outputs
 
-    assert preview is not None
-    assert preview.plan_matches is False
+    (tmp_path / "marker.txt").unlink()
+    preview = preview_resume(plan, base_dir=tmp_path)
 
+    assert "align-root1" in preview.missing_outputs
 
-def test_resume_adds_restart_for_existing_toil_jobstore(tmp_path: Path):
-    bin_dir = tmp_path / "bin"
-    bin_dir.mkdir()
-    _write_executable(
-        bin_dir / "cactus-blast",
-        """#!/usr/bin/env python3
-import sys
-from pathlib import Path
 
-jobstore = Path(sys.argv[1])
-jobstore.mkdir(parents=True, exist_ok=True)
-(jobstore / "files" / "shared").mkdir(parents=True, exist_ok=True)
-(jobstore / "files" / "shared" / "rootJobStoreID").write_text("ok")
+def test_preview_resume_detects_signature_mismatch(tmp_path):
+    plan = _build_plan(tmp_path)
+    runner = PlanRunner(plan, base_dir=tmp_path, run_settings=RunSettings(verbose=False, resume=True))
+    runner.run()
+
+    preview = preview_resume(plan, base_dir=tmp_path, thread_count=8)
 
-args = " ".join(sys.argv[1:])
-Path("seen-args.txt").write_text(args)
+    assert preview is not None
+    assert preview.plan_matches is False
 
-if "--restart" not in sys.argv:
-    sys.exit(1)
 
-out = next((a for a in sys.argv[1:] if a.endswith(".paf")), None)
-if out:
-    Path(out).write_text("ok")
-sys.exit(0)
-""",
-    )
-    env = {"PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"}
+def test_resume_adds_restart_for_existing_toil_jobstore(tmp_path: Path, stub_env):
+    env = stub_env("blast-requires-restart")
 
     header = PrepareHeader(generated_by="cactus-prepare --outSeqFile seq.fa --outDir out", date=datetime.now())
     step = Step(
@@ -163,38 +152,12 @@ sys.exit(0)
     assert "--restart" in (tmp_path / "seen-args.txt").read_text()
 
 
-def test_resume_cleans_toil_jobstore_when_forced_to_rerun(tmp_path: Path):
-    bin_dir = tmp_path / "bin"
-    bin_dir.mkdir()
-    _write_executable(
-        bin_dir / "cactus-blast",
-        """#!/usr/bin/env python3
-import sys
-from pathlib import Path
-
-jobstore = Path(sys.argv[1])
-if jobstore.exists():
-    # Runner should have cleaned it when rerunning a previously-successful step.
-    sys.exit(2)
-if "--restart" in sys.argv:
-    sys.exit(3)
-
-jobstore.mkdir(parents=True, exist_ok=True)
-out = next((a for a in sys.argv[1:] if a.endswith(".paf")), None)
-if out:
-    Path(out).write_text("ok")
-
-counter = Path("blast-count.txt")
-n = int(counter.read_text()) if counter.exists() else 0
-counter.write_text(str(n + 1))
-sys.exit(0)
-""",
-    )
-    env = {"PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"}
+def test_resume_cleans_toil_jobstore_when_forced_to_rerun(tmp_path: Path, stub_env):
+    env = stub_env("blast-requires-clean-jobstore")
 
     header = PrepareHeader(generated_by="cactus-prepare --outSeqFile seq.fa --outDir out", date=datetime.now())
     step1 = Step(
-        raw="python -c \"from pathlib import Path; Path('a.txt').write_text('ok')\"",
+        raw=f"{PYTHON} -c \"from pathlib import Path; Path('a.txt').write_text('ok')\"",
         kind="preprocess",
         out_files=["a.txt"],
         label="make-a",
@@ -229,40 +192,10 @@ sys.exit(0)
     assert (tmp_path / "blast-count.txt").read_text() == "2"
 
 
-def test_resume_cleans_corrupt_jobstore_instead_of_restart(tmp_path: Path):
+def test_resume_cleans_corrupt_jobstore_instead_of_restart(tmp_path: Path, stub_env):
     """jobStore 存在但缺少 rootJobStoreID 时，--restart 会报错，应当清理后重跑。"""
 
-    bin_dir = tmp_path / "bin"
-    bin_dir.mkdir()
-    _write_executable(
-        bin_dir / "cactus-blast",
-        """#!/usr/bin/env python3
-import sys
-from pathlib import Path
-
-jobstore = Path(sys.argv[1])
-
-# 若 runner 未在启动前清理，直接失败。
-if jobstore.exists():
-    sys.exit(2)
-if "--restart" in sys.argv:
-    sys.exit(3)
-
-marker = Path("first-run.txt")
-if not marker.exists():
-    # 第一次：制造一个“看似存在但不完整”的 jobStore（缺少 rootJobStoreID），并失败
-    (jobstore / "files" / "shared").mkdir(parents=True, exist_ok=True)
-    (jobstore / "files" / "shared" / "config.pickle").write_text("x")
-    marker.write_text("1")
-    sys.exit(1)
-
-out = next((a for a in sys.argv[1:] if a.endswith(".paf")), None)
-if out:
-    Path(out).write_text("ok")
-sys.exit(0)
-""",
-    )
-    env = {"PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"}
+    env = stub_env("blast-corrupt-jobstore")
 
     header = PrepareHeader(generated_by="cactus-prepare --outSeqFile seq.fa --outDir out", date=datetime.now())
     step = Step(
@@ -296,15 +229,15 @@ def test_resume_only_skips_prefix_steps(tmp_path: Path):
 
     header = PrepareHeader(generated_by="cactus-prepare --outSeqFile seq.fa --outDir out", date=datetime.now())
     step1 = Step(
-        raw="python -c \"from pathlib import Path; Path('a.txt').write_text('ok')\"",
+        raw=f"{PYTHON} -c \"from pathlib import Path; Path('a.txt').write_text('ok')\"",
         kind="preprocess",
         out_files=["a.txt"],
         label="make-a",
     )
     step2 = Step(
         raw=(
-            "python -c \"from pathlib import Path; p=Path('b.txt'); "
-            "n=int(p.read_text()) if p.exists() else 0; p.write_text(str(n+1))\""
+            f"{PYTHON} -c \"import os; fd=os.open('b.txt', os.O_RDWR|os.O_CREAT, 0o644); "
+            "n=int(os.read(fd, 32) or b'0'); os.pwrite(fd, str(n+1).encode(), 0); os.close(fd)\""
         ),
         kind="preprocess",
         out_files=["b.txt"],
@@ -339,46 +272,14 @@ def test_resume_only_skips_prefix_steps(tmp_path: Path):
     assert (tmp_path / "b.txt").read_text() == "2"
 
 
-def test_resume_cleans_failed_toil_jobstore_when_not_first_step(tmp_path: Path):
+def test_resume_cleans_failed_toil_jobstore_when_not_first_step(tmp_path: Path, stub_env):
     """当失败的 Toil 步骤不是本次重跑的第一个步骤时，应清理 jobStore 而不是 --restart。"""
 
-    bin_dir = tmp_path / "bin"
-    bin_dir.mkdir()
-    _write_executable(
-        bin_dir / "cactus-blast",
-        """#!/usr/bin/env python3
-import sys
-from pathlib import Path
-
-jobstore = Path(sys.argv[1])
-Path("seen-args.txt").write_text(" ".join(sys.argv[1:]))
-
-marker = Path("first-run.txt")
-if not marker.exists():
-    (jobstore / "files" / "shared").mkdir(parents=True, exist_ok=True)
-    (jobstore / "files" / "shared" / "rootJobStoreID").write_text("ok")
-    marker.write_text("1")
-    sys.exit(1)
-
-if jobstore.exists():
-    sys.exit(2)
-if "--restart" in sys.argv:
-    sys.exit(3)
-
-(jobstore / "files" / "shared").mkdir(parents=True, exist_ok=True)
-(jobstore / "files" / "shared" / "rootJobStoreID").write_text("ok")
-
-out = next((a for a in sys.argv[1:] if a.endswith(".paf")), None)
-if out:
-    Path(out).write_text("ok")
-sys.exit(0)
-""",
-    )
-    env = {"PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"}
+    env = stub_env("blast-fails-first-run")
 
     header = PrepareHeader(generated_by="cactus-prepare --outSeqFile seq.fa --outDir out", date=datetime.now())
     step1 = Step(
-        raw="python -c \"from pathlib import Path; Path('a.txt').write_text('ok')\"",
+        raw=f"{PYTHON} -c \"from pathlib import Path; Path('a.txt').write_text('ok')\"",
         kind="preprocess",
         out_files=["a.txt"],
         label="make-a",
@@ -414,37 +315,15 @@ sys.exit(0)
     assert "--restart" not in (tmp_path / "seen-args.txt").read_text()
 
 
-def test_resume_reruns_blast_when_paf_inconsistent_with_fasta(tmp_path: Path):
+def test_resume_reruns_blast_when_paf_inconsistent_with_fasta(tmp_path: Path, stub_env):
     """PAF 引用的 contig 与当前 FASTA 不一致时，不应跳过 blast 步骤。"""
 
-    bin_dir = tmp_path / "bin"
-    bin_dir.mkdir()
-    _write_executable(
-        bin_dir / "cactus-blast",
-        """#!/usr/bin/env python3
-import sys
-from pathlib import Path
-
-counter = Path("blast-count.txt")
-n = int(counter.read_text()) if counter.exists() else 0
-counter.write_text(str(n + 1))
-
-out = sys.argv[3] if len(sys.argv) > 3 else "out.paf"
-
-# 故意写一个“与 FASTA 不一致”的 PAF：A 的 contig 写成 A.chr1，但 FASTA 里只有 ArefChr0
-Path(out).write_text(
-    "id=B|BrefChr0\\t4\\t0\\t4\\t+\\tid=A|A.chr1\\t4\\t0\\t4\\t4\\t4\\t60\\n",
-    encoding="utf-8",
-)
-sys.exit(0)
-""",
-    )
-    env = {"PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"}
+    env = stub_env("blast-stale-paf")
 
     header = PrepareHeader(generated_by="cactus-prepare --outSeqFile seq.fa --outDir out", date=datetime.now())
     step0 = Step(
         raw=(
-            "python -c \"from pathlib import Path; "
+            f"{PYTHON} -c \"from pathlib import Path; "
             "Path('A.fa').write_text('>ArefChr0\\nACGT\\n'); "
             "Path('B.fa').write_text('>BrefChr0\\nACGT\\n'); "
             "Path('seq.txt').write_text('(A:0.1,B:0.1)R;\\nA\\tA.fa\\nB\\tB.fa\\n')\""
@@ -462,8 +341,8 @@ sys.exit(0)
     )
     step2 = Step(
         raw=(
-            "python -c \"from pathlib import Path; p=Path('after-count.txt'); "
-            "n=int(p.read_text()) if p.exists() else 0; p.write_text(str(n+1))\""
+            f"{PYTHON} -c \"import os; fd=os.open('after-count.txt', os.O_RDWR|os.O_CREAT, 0o644); "
+            "n=int(os.read(fd, 32) or b'0'); os.pwrite(fd, str(n+1).encode(), 0); os.close(fd)\""
         ),
         kind="preprocess",
         out_files=["after-count.txt"],
@@ -489,3 +368,30 @@ sys.exit(0)
     # step0 会被跳过，但 step1 的 PAF 校验失败 -> step1/step2 必须重跑
     assert (tmp_path / "blast-count.txt").read_text() == "2"
     assert (tmp_path / "after-count.txt").read_text() == "2"
+
+
+def test_run_state_file_bytes_match_json_with_orjson(tmp_path: Path):
+    pytest.importorskip("orjson")
+    # Same shape PlanRunner writes: strings, ints, bools and None in nested dicts, no floats.
+    state = {
+        "plan_signature": "abc123",
+        "commands": {
+            "k1": {
+                "index": 0,
+                "display_name": "align-root1",
+                "preview": "cactus-align jobstore seq.fa root1.paf root1.hal",
+                "stable_key": "k1",
+                "log_path": "logs/祖先-合并.log",
+                "status": "success",
+                "exit_code": 0,
+                "updated_at": "2026-01-01T00:00:00Z",
+                "skipped": True,
+            },
+            "k2": {"index": 1, "display_name": "合并", "log_path": None, "status": "running"},
+        },
+    }
+    path = tmp_path / "run_state.json"
+
+    write_run_state_file(path, state)
+
+    assert path.read_bytes() == json.dumps(state, indent=2, ensure_ascii=False).encode("utf-8")
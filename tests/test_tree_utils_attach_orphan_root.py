@@ -51,3 +51,37 @@ def test_multiple_orphans_added_as_children(tmp_path: Path):
     assert tree is not None
     names = {child.name for child in tree.root.children}
     assert {"Anc0", "Anc1"}.issubset(names)
+
+
+def test_find_sees_nodes_added_after_invalidate(tmp_path: Path):
+    tree = tree_utils.build_alignment_tree(_plan(tmp_path), base_dir=tmp_path)
+    assert tree is not None
+    assert tree.find("extra") is None
+
+    tree.root.children.append(tree_utils.AlignmentNode(name="extra", parent=tree.root))
+    tree.invalidate_index()
+
+    assert tree.find("extra") is tree.root.children[-1]
+
+
+def test_node_names_share_round_root_strings(tmp_path: Path):
+    plan = _plan(tmp_path)
+    tree = tree_utils.build_alignment_tree(plan, base_dir=tmp_path)
+    assert tree is not None
+
+    node = tree.find("cb")
+    # Both sides are interned, so attaching rounds compares by identity.
+    assert node is not None and node.name is plan.rounds[0].root
+    assert plan.rounds[0].blast_step.root is plan.rounds[0].root
+
+
+def test_flat_view_slices_subtrees_and_walks_ancestors(tmp_path: Path):
+    tree = tree_utils.build_alignment_tree(_plan(tmp_path), base_dir=tmp_path)
+    assert tree is not None
+
+    cb = tree.find("cb")
+    flat = tree.flat
+
+    assert [node.name for node in flat.subtree(cb)] == ["cb", "b", "c"]
+    assert list(flat.ancestors(cb.children[0])) == [cb, tree.root]
+    assert len(flat.subtree(tree.root)) == len(flat.nodes)
@@ -35,3 +35,30 @@ def test_build_tree_uses_preprocess_input_when_outseq_missing(tmp_path: Path):
     assert tree is not None
     assert tree.root.name == "c"
     assert tree.root.round and tree.root.round.root == "c"
+
+
+def test_build_tree_skips_undecodable_preprocess_inputs(tmp_path: Path):
+    # A binary argument (e.g. the interpreter running a step) precedes the real input file.
+    binary_path = tmp_path / "tool.bin"
+    binary_path.write_bytes(b"\x7fELF\xff\xfe\x00\x01")
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("(a,b)c;", encoding="utf-8")
+
+    header = PrepareHeader(generated_by="cactus-prepare --outSeqFile missing.txt", date=datetime.now())
+    preprocess = Step(
+        raw=f"{binary_path} jobstore/0 {input_path} missing.txt",
+        kind="preprocess",
+        out_files=["missing.txt"],
+    )
+    plan = Plan(
+        header=header,
+        preprocess=[preprocess],
+        rounds=[_round("c")],
+        hal_merges=[],
+        out_seq_file=str(tmp_path / "missing.txt"),
+    )
+
+    tree = tree_utils.build_alignment_tree(plan, base_dir=tmp_path)
+
+    assert tree is not None
+    assert tree.root.name == "c"
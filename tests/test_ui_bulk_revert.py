@@ -18,7 +18,7 @@ def _build_tree():
 
 def test_bulk_revert_when_toggling_child():
     root, child = _build_tree()
-    widget = AsciiPhylo(root)
+    widget = AsciiPhylo(tree_utils.AlignmentTree(root))
     # Simulate ancestor subtree mode
     assert "--subtree-mode" in root.round.ramax_opts
 
@@ -28,3 +28,30 @@ def test_bulk_revert_when_toggling_child():
     assert root.round.replace_with_ramax is False
     assert "--subtree-mode" not in root.round.ramax_opts
     assert child.round.replace_with_ramax is True
+
+
+def test_bulk_revert_clears_every_subtree_ancestor():
+    root, child = _build_tree()
+    child.round.ramax_opts.append("--subtree-mode")
+    leaf = tree_utils.AlignmentNode(name="leaf", parent=child)
+    child.children.append(leaf)
+    widget = AsciiPhylo(tree_utils.AlignmentTree(root))
+
+    assert widget._maybe_revert_bulk(leaf) is True
+
+    for node in (root, child):
+        assert node.round.replace_with_ramax is False
+        assert "--subtree-mode" not in node.round.ramax_opts
+
+
+def test_bulk_revert_sees_nodes_added_after_the_view_was_built():
+    root, child = _build_tree()
+    child.round.ramax_opts.append("--subtree-mode")
+    tree = tree_utils.AlignmentTree(root)
+    assert len(tree.flat.nodes) == 2
+    leaf = tree_utils.AlignmentNode(name="leaf", parent=child)
+    child.children.append(leaf)
+    widget = AsciiPhylo(tree)
+
+    assert widget._maybe_revert_bulk(leaf) is True
+    assert child.round.replace_with_ramax is False